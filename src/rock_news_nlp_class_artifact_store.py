@@ -0,0 +1,235 @@
+"""
+Rock News NLP: Model Artifact Store Class
+Created on Sun Oct 18 17:05:51 2026
+@author: IvoBarros
+"""
+
+import os
+import os.path
+import copy
+import importlib
+import json
+import pickle
+import shutil
+import numpy as np
+from time import strftime
+
+class artifact_store:
+    """
+    Versioned store of the model artifacts (vectorizer, lda model, gensim
+    dictionary, topic dicts, ...) of one model, laid out as
+
+        {path}/{name}/v0001/manifest.json
+        {path}/{name}/v0001/{artifact}.npy | .pickle | .gensim
+        {path}/{name}/latest
+
+    NumPy arrays, and the NumPy attributes of pickled objects larger than
+    sep_limit bytes (e.g. LatentDirichletAllocation.components_), are written
+    as separate .npy files; gensim objects use their own save with the same
+    sep_limit. Loaded with mmap_mode='r', the arrays are memory-mapped, so
+    several inference workers share one copy of the model in page cache.
+    """
+
+    def __init__(self, path, name, sep_limit=1024*1024):
+        self.path = os.path.join(path, name)
+        self.name = name
+        self.sep_limit = sep_limit
+
+    def version_path(self, version):
+        """
+        To get the folder of a version
+
+        Args:
+            version : int
+
+        Returns:
+            str
+        """
+        return os.path.join(self.path, f'v{version:04d}')
+
+    def versions(self):
+        """
+        To list the saved versions
+
+        Returns:
+            list
+        """
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(int(i[1:]) for i in os.listdir(self.path)
+                      if i.startswith('v') and i[1:].isdigit() and os.path.exists(os.path.join(self.path, i, 'manifest.json')))
+
+    def latest_version(self):
+        """
+        To get the version pointed by the latest file (None if the store is empty)
+
+        Returns:
+            int
+        """
+        if not os.path.exists(os.path.join(self.path, 'latest')):
+            return None
+        with open(os.path.join(self.path, 'latest'), 'r', encoding='utf-8') as f:
+            return int(f.read().strip())
+
+    def exists(self):
+        """
+        To check whether a version has been saved
+
+        Returns:
+            bool
+        """
+        return self.latest_version() is not None
+
+    def manifest(self, version=None):
+        """
+        To read the manifest of a version (default latest)
+
+        Args:
+            version : int
+
+        Returns:
+            dict
+        """
+        version = self.latest_version() if version is None else version
+        if version is None:
+            raise FileNotFoundError(f'The artifact store {self.path} is empty')
+        with open(os.path.join(self.version_path(version), 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def is_gensim_object(py_object):
+        """
+        To check whether an object has the gensim save/load interface
+
+        Args:
+            py_object : object
+
+        Returns:
+            bool
+        """
+        try:
+            from gensim.utils import SaveLoad
+        except ImportError:
+            return False
+        return isinstance(py_object, SaveLoad)
+
+    def save_artifact(self, version_path, key, py_object):
+        """
+        To write one artifact: a NumPy array as .npy, a gensim object with 
+        its own save and any other object as a pickle, its NumPy attributes
+        larger than sep_limit being written as separate .npy files
+
+        Args:
+            version_path : str
+            key : str
+            py_object : object
+
+        Returns:
+            dict (manifest entry of the artifact)
+        """
+        if isinstance(py_object, np.ndarray):
+            np.save(os.path.join(version_path, f'{key}.npy'), py_object)
+            return {'kind': 'npy', 'file': f'{key}.npy'}
+        if self.is_gensim_object(py_object):
+            py_object.save(os.path.join(version_path, f'{key}.gensim'), sep_limit=self.sep_limit)
+            return {'kind': 'gensim', 'file': f'{key}.gensim', 'class': f'{type(py_object).__module__}.{type(py_object).__qualname__}'}
+        arrays = {}
+        if hasattr(py_object, '__dict__'):
+            arrays = {k: v for k, v in vars(py_object).items() if isinstance(v, np.ndarray) and v.nbytes >= self.sep_limit}
+        if arrays:
+            py_object = copy.copy(py_object)
+            for k, v in arrays.items():
+                np.save(os.path.join(version_path, f'{key}.{k}.npy'), v)
+                delattr(py_object, k)
+        with open(os.path.join(version_path, f'{key}.pickle'), 'wb') as f:
+            pickle.dump(py_object, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {'kind': 'pickle', 'file': f'{key}.pickle', 'arrays': {k: f'{key}.{k}.npy' for k in arrays}}
+
+    def load_artifact(self, version_path, artifact, mmap_mode='r'):
+        """
+        To read one artifact from its manifest entry, memory-mapping its 
+        arrays with mmap_mode
+
+        Args:
+            version_path : str
+            artifact : dict (manifest entry of the artifact)
+            mmap_mode : str, default 'r'
+
+        Returns:
+            object
+        """
+        if artifact['kind'] == 'npy':
+            return np.load(os.path.join(version_path, artifact['file']), mmap_mode=mmap_mode)
+        if artifact['kind'] == 'gensim':
+            module_name, class_name = artifact['class'].rsplit('.', 1)
+            gensim_class = getattr(importlib.import_module(module_name), class_name)
+            return gensim_class.load(os.path.join(version_path, artifact['file']), mmap=mmap_mode)
+        with open(os.path.join(version_path, artifact['file']), 'rb') as f:
+            py_object = pickle.load(f)
+        for k, file_name in artifact.get('arrays', {}).items():
+            setattr(py_object, k, np.load(os.path.join(version_path, file_name), mmap_mode=mmap_mode))
+        return py_object
+
+    def save(self, dict_artifacts, metadata=None):
+        """
+        To write the artifacts as a new version and point latest to it
+
+        Args:
+            dict_artifacts : dict (artifact name as key, object as value)
+            metadata : dict, default None (json serializable)
+
+        Returns:
+            int (the new version)
+        """
+        os.makedirs(self.path, exist_ok=True)
+        version = max(self.versions() + [self.latest_version() or 0]) + 1
+        version_path = self.version_path(version)
+        temp_path = f'{version_path}.tmp'
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        manifest = {'name': self.name, 'version': version, 'created': strftime('%Y-%m-%d %H:%M:%S'),
+                    'metadata': metadata or {}, 'artifacts': {}}
+        for key, py_object in dict_artifacts.items():
+            manifest['artifacts'][key] = self.save_artifact(temp_path, key, py_object)
+        with open(os.path.join(temp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, version_path)
+        with open(os.path.join(self.path, 'latest.tmp'), 'w', encoding='utf-8') as f:
+            f.write(str(version))
+        os.replace(os.path.join(self.path, 'latest.tmp'), os.path.join(self.path, 'latest'))
+        return version
+
+    def load(self, version=None, mmap_mode='r', keys=None):
+        """
+        To load the artifacts of a version (default latest)
+
+        Args:
+            version : int
+            mmap_mode : str, default 'r' (None to read the arrays in memory,
+                        e.g. to keep training the model)
+            keys : iterable, default None (all the artifacts)
+
+        Returns:
+            dict
+        """
+        manifest = self.manifest(version)
+        version_path = self.version_path(manifest['version'])
+        keys = manifest['artifacts'].keys() if keys is None else keys
+        return {k: self.load_artifact(version_path, manifest['artifacts'][k], mmap_mode) for k in keys}
+
+    def prune(self, keep=3):
+        """
+        To delete the oldest versions, always keeping the latest one
+
+        Args:
+            keep : int
+
+        Returns:
+            list (deleted versions)
+        """
+        latest = self.latest_version()
+        versions = self.versions()
+        deleted = [i for i in versions[:max(len(versions) - keep, 0)] if i != latest]
+        for i in deleted:
+            shutil.rmtree(self.version_path(i))
+        return deleted
@@ -0,0 +1,197 @@
+"""
+Rock News NLP: Fetch Engine Class
+Created on Sun Oct 18 18:32:40 2026
+@author: IvoBarros
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from random import uniform
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+
+fetch_result = namedtuple('fetch_result', ['url', 'status_code', 'content', 'headers', 'error', 'attempts'])
+
+class token_bucket:
+    """
+    Thread-safe token bucket: up to capacity requests in a burst, refilled
+    at rate requests per second
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.t_last = monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        To block until a token is available and take it
+
+        Returns:
+            None
+        """
+        while True:
+            with self.lock:
+                t_now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (t_now - self.t_last) * self.rate)
+                self.t_last = t_now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+class requests_transport:
+    """
+    Default transport: a requests Session whose connection pool keeps the
+    connections alive across the requests to the same host
+
+    Any object with a get(url, headers, timeout) method returning an object
+    with status_code, content and headers can be used as a transport.
+    """
+
+    def __init__(self, pool_maxsize=10, headers=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        To get a url with the pooled session
+
+        Args:
+            url : str
+            headers : dict, default None
+            timeout : float, default None
+
+        Returns:
+            requests.Response
+        """
+        return self.session.get(url, headers=headers, timeout=timeout)
+
+    def close(self):
+        """
+        To close the session and its connection pools
+
+        Returns:
+            None
+        """
+        self.session.close()
+
+class fetch_engine:
+    """
+    Thread-pool fetch engine with bounded concurrency, a token-bucket rate
+    limiter per host and retries with exponential backoff (plus jitter) on
+    connection errors and on the retry_statuses
+
+    An offline transport (e.g. cached_transport in replay mode) is neither
+    rate limited nor retried.
+    """
+
+    def __init__(self, transport=None, max_workers=4, rate_per_host=1.0, burst=1, max_retries=3,
+                 backoff_factor=1.0, retry_statuses=(429, 500, 502, 503, 504), timeout=30):
+        self.transport = transport if transport is not None else requests_transport(pool_maxsize=max_workers)
+        self.max_workers = max_workers
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = set(retry_statuses)
+        self.timeout = timeout
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        """
+        To get the token bucket of the host of a url (created on first use)
+
+        Args:
+            url : str
+
+        Returns:
+            token_bucket
+        """
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = token_bucket(self.rate_per_host, self.burst)
+            return self.buckets[host]
+
+    def backoff(self, attempt, response=None):
+        """
+        To get the wait before the next attempt: the Retry-After header of 
+        the response if given in seconds, else an exponential backoff with 
+        jitter
+
+        Args:
+            attempt : int
+            response : requests.Response, default None
+
+        Returns:
+            float (seconds)
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None and str(retry_after).isdigit():
+            return float(retry_after)
+        return self.backoff_factor * 2 ** attempt + uniform(0, self.backoff_factor)
+
+    def fetch(self, url, headers=None):
+        """
+        To get a url, retrying on connection errors and retry statuses
+
+        Args:
+            url : str
+            headers : dict, default None
+
+        Returns:
+            fetch_result
+        """
+        offline = getattr(self.transport, 'offline', False)
+        max_retries = 0 if offline else self.max_retries
+        response, error = None, None
+        for attempt in range(max_retries + 1):
+            if self.rate_per_host and not offline:
+                self.bucket(url).acquire()
+            try:
+                response, error = self.transport.get(url, headers=headers, timeout=self.timeout), None
+            except Exception as e:
+                response, error = None, e
+            if response is not None and response.status_code not in self.retry_statuses:
+                break
+            if attempt < max_retries:
+                sleep(self.backoff(attempt, response))
+        if response is None:
+            return fetch_result(url, None, None, {}, error, attempt + 1)
+        return fetch_result(url, response.status_code, response.content, response.headers, None, attempt + 1)
+
+    def fetch_all(self, urls, headers=None):
+        """
+        To get a list of urls concurrently
+
+        Args:
+            urls : iterable
+            headers : dict, default None
+
+        Returns:
+            list of fetch_result (in the order of the urls)
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda i: self.fetch(i, headers), urls))
+
+    def close(self):
+        """
+        To close the transport
+
+        Returns:
+            None
+        """
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
@@ -0,0 +1,107 @@
+"""
+Rock News NLP: Gazetteer Index Class
+Created on Sun Oct 18 10:21:36 2026
+@author: IvoBarros
+"""
+
+from collections import deque
+
+class gazetteer_index:
+    """
+    Word-level Aho-Corasick automaton over one or more named dictionaries
+    (groups) of entity names.
+
+    The automaton is built once and every text is scanned in a single linear
+    pass, returning the matches of all groups at once. The text and the
+    entity names are split by single spaces, so a name matches a text exactly
+    when tpp.word_search(name, text) is True.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.groups = []
+        self.is_built = False
+
+    def add_keywords(self, group, keywords):
+        """
+        To add a dictionary of entity names to the index
+
+        Args:
+            group : str
+            keywords : set or dict (entity name as key, returned value as value)
+
+	Returns:
+	    None
+        """
+        if group not in self.groups:
+            self.groups.append(group)
+        if not isinstance(keywords, dict):
+            keywords = {i: i for i in keywords}
+        for keyword, value in keywords.items():
+            if not keyword:
+                continue
+            state = 0
+            for token in keyword.split(' '):
+                next_state = self.goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][token] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            if (group, value) not in self.output[state]:
+                self.output[state].append((group, value))
+        self.is_built = False
+
+    def build(self):
+        """
+        To compute the failure links of the automaton (breadth-first) and
+        merge the outputs of the longest proper suffixes
+
+	Returns:
+	    gazetteer_index
+        """
+        queue = deque()
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and token not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(token, 0)
+                self.output[next_state] = self.output[next_state] + [i for i in self.output[self.fail[next_state]]
+                                                                     if i not in self.output[next_state]]
+        self.is_built = True
+        return self
+
+    def search(self, text):
+        """
+        To return the entity names of every group found in a text
+
+        Args:
+            text : str
+
+	Returns:
+	    dict (group as key, list of distinct matches in order of appearance as value)
+        """
+        if not self.is_built:
+            self.build()
+        matches = {i: [] for i in self.groups}
+        seen = set()
+        state = 0
+        for token in text.split(' '):
+            while state and token not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(token, 0)
+            for match in self.output[state]:
+                if match not in seen:
+                    seen.add(match)
+                    matches[match[0]].append(match[1])
+        return matches
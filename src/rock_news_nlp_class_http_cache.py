@@ -0,0 +1,203 @@
+"""
+Rock News NLP: HTTP Cache Class
+Created on Sun Oct 18 19:48:15 2026
+@author: IvoBarros
+"""
+
+import os
+import os.path
+import sqlite3
+import threading
+import zlib
+from time import time
+
+class cached_response:
+    """
+    Response served from the http cache
+    """
+
+    def __init__(self, url, status_code, content, headers):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = True
+
+class cached_transport:
+    """
+    On-disk http cache (sqlite, keyed by url) wrapping a fetch_engine
+    transport
+
+    The 200 responses are stored with their ETag/Last-Modified headers and a
+    zlib compressed body. The next request to the same url is conditional
+    (If-None-Match/If-Modified-Since) and a 304 is served from disk. The
+    least recently used entries are evicted once the bodies exceed
+    max_bytes. In offline mode nothing is requested: the cached responses
+    are replayed and a miss returns a 504, like an only-if-cached request.
+    """
+
+    def __init__(self, transport, file_path, max_bytes=512*1024*1024, offline=False, compress_level=6):
+        self.transport = transport
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.compress_level = compress_level
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self.lock = threading.Lock()
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        self.conn = sqlite3.connect(file_path, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                 url TEXT PRIMARY KEY, status_code INTEGER, etag TEXT, last_modified TEXT,
+                                 content_type TEXT, body BLOB, size INTEGER, stored_at REAL, accessed_at REAL)""")
+        self.conn.commit()
+
+    def count(self, stat):
+        """
+        To increment a counter of the cache stats (get is called from the 
+        worker threads of the fetch_engine)
+
+        Args:
+            stat : str
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.stats[stat] += 1
+
+    def lookup(self, url):
+        """
+        To get the cache entry of a url
+
+        Args:
+            url : str
+
+        Returns:
+            tuple (status_code, etag, last_modified, content_type, body), None if the url is not cached
+        """
+        with self.lock:
+            return self.conn.execute("""SELECT status_code, etag, last_modified, content_type, body
+                                        FROM responses WHERE url = ?""", (url,)).fetchone()
+
+    def touch(self, url, revalidated=False):
+        """
+        To update the last access time of a cache entry (and its storage time
+        if it has just been revalidated with a 304)
+
+        Args:
+            url : str
+            revalidated : bool
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if revalidated:
+                self.conn.execute("UPDATE responses SET accessed_at = ?, stored_at = ? WHERE url = ?", (time(), time(), url))
+            else:
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time(), url))
+            self.conn.commit()
+
+    def store(self, url, response):
+        """
+        To store a 200 response with its validators and compressed body, 
+        evicting the least recently used entries if needed
+
+        Args:
+            url : str
+            response : requests.Response
+
+        Returns:
+            None
+        """
+        body = zlib.compress(response.content, self.compress_level)
+        headers = response.headers
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              (url, response.status_code, headers.get('ETag'), headers.get('Last-Modified'),
+                               headers.get('Content-Type'), body, len(body), time(), time()))
+            self.stats['stored'] += 1
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """
+        To delete the least recently used entries until the bodies fit in 
+        max_bytes (called with the lock held)
+
+        Returns:
+            None
+        """
+        total_size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            if total_size <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total_size -= size
+            self.stats['evicted'] += 1
+
+    @staticmethod
+    def to_response(url, entry):
+        """
+        To build the response of a cache entry
+
+        Args:
+            url : str
+            entry : tuple (see lookup)
+
+        Returns:
+            cached_response
+        """
+        status_code, etag, last_modified, content_type, body = entry
+        headers = {k: v for k, v in [('ETag', etag), ('Last-Modified', last_modified), ('Content-Type', content_type)] if v}
+        return cached_response(url, status_code, zlib.decompress(body), headers)
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        To get a url through the cache
+
+        Args:
+            url : str
+            headers : dict, default None
+            timeout : float, default None
+
+        Returns:
+            requests.Response or cached_response
+        """
+        entry = self.lookup(url)
+        if self.offline:
+            if entry is None:
+                self.count('misses')
+                return cached_response(url, 504, None, {})
+            self.count('hits')
+            return self.to_response(url, entry)
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry[1]:
+                headers['If-None-Match'] = entry[1]
+            if entry[2]:
+                headers['If-Modified-Since'] = entry[2]
+        response = self.transport.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            self.count('revalidated')
+            self.touch(url, revalidated=True)
+            return self.to_response(url, entry)
+        self.count('misses')
+        if response.status_code == 200 and response.content is not None:
+            self.store(url, response)
+        return response
+
+    def close(self):
+        """
+        To close the sqlite connection and the wrapped transport
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.conn.close()
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
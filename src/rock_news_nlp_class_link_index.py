@@ -0,0 +1,61 @@
+"""
+Rock News NLP: Link Index Class
+Created on Sun Oct 18 21:03:27 2026
+@author: IvoBarros
+"""
+
+import os
+import os.path
+
+class link_index:
+    """
+    Persistent set of the already scraped links (O(1) membership checks),
+    stored as an append-only text file with one link per line
+
+    The file is the source of truth: the seed links (e.g. the links of the 
+    rock news CSV file) are only used when the file does not exist yet, and 
+    are kept in memory until the first update writes them to the file.
+    """
+
+    def __init__(self, file_path, links=None):
+        self.file_path = file_path
+        self.links = set()
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self.links = {i.rstrip('\n') for i in f if i.strip()}
+        elif links is not None:
+            self.links = {i for i in links if isinstance(i, str) and i}
+
+    def __contains__(self, link):
+        return link in self.links
+
+    def __len__(self):
+        return len(self.links)
+
+    def __iter__(self):
+        return iter(self.links)
+
+    def update(self, links):
+        """
+        To add links to the index, appending only the unseen ones to the file
+
+        Args:
+            links : iterable
+
+        Returns:
+            int (number of new links)
+        """
+        new_links = []
+        for i in links:
+            if isinstance(i, str) and i and i not in self.links:
+                self.links.add(i)
+                new_links.append(i)
+        if not os.path.exists(self.file_path):
+            if os.path.dirname(self.file_path):
+                os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                f.writelines(f'{i}\n' for i in sorted(self.links))
+        elif new_links:
+            with open(self.file_path, 'a', encoding='utf-8') as f:
+                f.writelines(f'{i}\n' for i in new_links)
+        return len(new_links)
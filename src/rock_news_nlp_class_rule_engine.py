@@ -0,0 +1,74 @@
+"""
+Rock News NLP: Rule Engine Class
+Created on Mon Oct 19 11:26:40 2026
+@author: IvoBarros
+"""
+
+from collections import defaultdict
+
+class rule_engine:
+    """
+    Compiled keyword rules of the rule-based text classification
+
+    Every keyword is indexed to the rules where it is used, so a text is
+    matched in a single tokenised pass and only the rules of the matched
+    keywords are evaluated: an 'any' rule fires with one of its keywords and
+    an 'all' rule when the counter of its matched keywords reaches its size.
+
+    The keywords are single tokens (the stems of the support dictionary have
+    no spaces), so a keyword matches a text exactly when
+    tpp.word_search(keyword, text) is True.
+    """
+
+    def __init__(self, keywords, dict_rules_all, dict_rules_any):
+        self.keyword_rank = {k: i for i, k in enumerate(keywords)}
+        self.rules = list(dict_rules_all) + list(dict_rules_any)
+        self.rule_size = [len(dict_rules_all[k]) for k in dict_rules_all] + [1 for k in dict_rules_any]
+        self.keyword_rules = defaultdict(list)
+        for rule_id, k in enumerate(self.rules):
+            rule_keywords = dict_rules_all[k] if rule_id < len(dict_rules_all) else dict_rules_any[k]
+            for keyword in rule_keywords:
+                self.keyword_rules[keyword].append(rule_id)
+        self.keyword_rules = dict(self.keyword_rules)
+
+    def match_keywords(self, text):
+        """
+        To get the keywords of a text
+
+        Args:
+            text : str
+
+        Returns:
+            list (in the order of the keywords)
+        """
+        matches = [i for i in set(text.split(' ')) if i in self.keyword_rank]
+        return sorted(matches, key=self.keyword_rank.get)
+
+    def match_rules(self, keywords):
+        """
+        To get the rules fired by a list of distinct keywords
+
+        Args:
+            keywords : list
+
+        Returns:
+            list (the 'all' rules followed by the 'any' rules, in the order of the dicts)
+        """
+        counter = defaultdict(int)
+        for keyword in keywords:
+            for rule_id in self.keyword_rules.get(keyword, ()):
+                counter[rule_id] += 1
+        return [self.rules[i] for i in sorted(counter) if counter[i] >= self.rule_size[i]]
+
+    def transform(self, text_corpus):
+        """
+        To get the keywords and the fired rules of every text of a corpus
+
+        Args:
+            text_corpus : list
+
+        Returns:
+            dict
+        """
+        keywords = [self.match_keywords(i) for i in text_corpus]
+        return {'keywords': keywords, 'sub_category_tags': [self.match_rules(i) for i in keywords]}
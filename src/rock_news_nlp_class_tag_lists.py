@@ -0,0 +1,286 @@
+"""
+Rock News NLP: Tag Lists Class
+Created on Mon Oct 19 15:37:09 2026
+@author: IvoBarros
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import os.path
+from scipy.sparse import csr_matrix, load_npz
+
+class tag_lists:
+    """
+    Document -> tags lists kept as CSR-style arrays: offsets (number of
+    documents + 1) and codes into a sorted vocabulary of tag names
+
+    The tags of document i are vocabulary[codes[offsets[i]:offsets[i+1]]].
+    Mapping, filtering, merging and deduplicating are vectorized array
+    operations; the Python lists are only built by to_lists.
+    """
+
+    def __init__(self, offsets, codes, vocabulary):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+
+    @classmethod
+    def from_lists(cls, lists):
+        """
+        To encode a list of tag lists
+
+        Args:
+            lists : list of list
+
+        Returns:
+            tag_lists
+        """
+        vocabulary = sorted({j for i in lists for j in i})
+        dict_code = {j: i for i, j in enumerate(vocabulary)}
+        codes = np.fromiter((dict_code[j] for i in lists for j in i), dtype=np.int64)
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(i) for i in lists])
+        return cls(offsets, codes, vocabulary)
+
+    @classmethod
+    def from_matrix(cls, matrix, labels):
+        """
+        To encode a boolean document x label matrix
+
+        Args:
+            matrix : Array of bool
+            labels : list
+
+        Returns:
+            tag_lists
+        """
+        order = np.argsort(np.asarray(labels, dtype=object))
+        matrix = np.asarray(matrix, dtype=bool)[:, order]
+        _, codes = np.nonzero(matrix)
+        offsets = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(matrix.sum(axis=1))
+        return cls(offsets, codes, np.asarray(labels, dtype=object)[order])
+
+    @classmethod
+    def from_sparse(cls, matrix, vocabulary):
+        """
+        To encode a sparse document x label indicator matrix
+
+        Args:
+            matrix : scipy.sparse matrix
+            vocabulary : list (sorted labels of the matrix columns)
+
+        Returns:
+            tag_lists
+        """
+        matrix = csr_matrix(matrix)
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        return cls(matrix.indptr, matrix.indices, vocabulary)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        """
+        To get the number of tags of every document
+
+        Returns:
+            Array of int64
+        """
+        return np.diff(self.offsets)
+
+    def doc_ids(self):
+        """
+        To get the document of every code
+
+        Returns:
+            Array of int64
+        """
+        return np.repeat(np.arange(len(self)), self.lengths())
+
+    def keep(self, mask_codes):
+        """
+        To keep the tags flagged by a mask over the codes
+
+        Args:
+            mask_codes : Array of bool
+
+        Returns:
+            tag_lists
+        """
+        counts = np.bincount(self.doc_ids()[mask_codes], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        return tag_lists(offsets, self.codes[mask_codes], self.vocabulary)
+
+    def map(self, mapping):
+        """
+        To rename the tags with a dict, dropping the tags without a value
+
+        Args:
+            mapping : dict
+
+        Returns:
+            tag_lists
+        """
+        mapped = [mapping.get(i) for i in self.vocabulary]
+        vocabulary = np.array(sorted({i for i in mapped if i is not None}), dtype=object)
+        dict_code = {j: i for i, j in enumerate(vocabulary)}
+        remap = np.array([dict_code.get(i, -1) if i is not None else -1 for i in mapped], dtype=np.int64)
+        codes = remap[self.codes] if len(remap) else self.codes
+        mapped_tags = tag_lists(self.offsets, codes, vocabulary)
+        return mapped_tags.keep(codes >= 0)
+
+    def filter(self, function):
+        """
+        To keep the tags whose name satisfies a condition
+
+        Args:
+            function : function (tag name -> bool)
+
+        Returns:
+            tag_lists
+        """
+        mask_vocabulary = np.array([bool(function(i)) for i in self.vocabulary], dtype=bool)
+        return self.keep(mask_vocabulary[self.codes] if len(mask_vocabulary) else np.zeros(0, dtype=bool))
+
+    def mask_docs(self, mask_docs):
+        """
+        To empty the documents not flagged by a mask over the documents
+
+        Args:
+            mask_docs : Array of bool
+
+        Returns:
+            tag_lists
+        """
+        return self.keep(np.asarray(mask_docs, dtype=bool)[self.doc_ids()])
+
+    def concat(self, *others):
+        """
+        To append the tags of other tag_lists of the same documents
+
+        Args:
+            *others : tag_lists
+
+        Returns:
+            tag_lists
+        """
+        all_tags = (self,) + others
+        vocabulary = np.array(sorted({j for i in all_tags for j in i.vocabulary}), dtype=object)
+        dict_code = {j: i for i, j in enumerate(vocabulary)}
+        list_doc_ids, list_codes = [], []
+        for i in all_tags:
+            remap = np.array([dict_code[j] for j in i.vocabulary], dtype=np.int64)
+            list_doc_ids.append(i.doc_ids())
+            list_codes.append(remap[i.codes] if len(remap) else i.codes)
+        doc_ids = np.concatenate(list_doc_ids)
+        order = np.argsort(doc_ids, kind='stable')
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(doc_ids, minlength=len(self)))
+        return tag_lists(offsets, np.concatenate(list_codes)[order], vocabulary)
+
+    def unique_sorted(self):
+        """
+        To remove the duplicated tags and sort the tags of every document
+        (the vocabulary is sorted, so the codes order is the names order)
+
+        Returns:
+            tag_lists
+        """
+        n_vocabulary = max(len(self.vocabulary), 1)
+        keys = np.unique(self.doc_ids() * n_vocabulary + self.codes)
+        doc_ids, codes = np.divmod(keys, n_vocabulary)
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(doc_ids, minlength=len(self)))
+        return tag_lists(offsets, codes, self.vocabulary)
+
+    def to_sparse(self, dtype=np.int8):
+        """
+        To build the sparse document x label indicator matrix (the columns
+        are the vocabulary; duplicated tags are summed)
+
+        Args:
+            dtype : numpy dtype
+
+        Returns:
+            scipy.sparse.csr_matrix
+        """
+        matrix = csr_matrix((np.ones(len(self.codes), dtype=dtype), self.codes, self.offsets), shape=(len(self), len(self.vocabulary)))
+        matrix.sum_duplicates()
+        return matrix
+
+    def counts_by(self, groups):
+        """
+        To count the documents per group and tag (e.g. articles per rock 
+        artist per month), as a sparse product of the group x document and 
+        the document x label indicator matrices
+
+        Args:
+            groups : list (group of every document, NaN to leave it out)
+
+        Returns:
+            DataFrame (group, tag and number of documents, only the non-zero counts)
+        """
+        group_codes, group_names = pd.factorize(pd.Series(list(groups), dtype=object), sort=True)
+        doc_ids = np.nonzero(group_codes >= 0)[0]
+        matrix_groups = csr_matrix((np.ones(len(doc_ids), dtype=np.int64), (group_codes[doc_ids], doc_ids)), shape=(len(group_names), len(self)))
+        counts = (matrix_groups @ self.unique_sorted().to_sparse(np.int64)).tocoo()
+        df_counts = pd.DataFrame({'group': np.asarray(group_names, dtype=object)[counts.row], 'tag': self.vocabulary[counts.col], 'n_docs': counts.data})
+        return df_counts.sort_values(['group','tag'], ignore_index=True)
+
+    def save_npz(self, file_path, doc_keys=None):
+        """
+        To save the sparse document x label indicator matrix in the 
+        scipy.sparse .npz format (data, indices, indptr, shape and format 
+        keys, readable by scipy.sparse.load_npz) with the label vocabulary 
+        and, optionally, the document keys as additional arrays
+
+        Args:
+            file_path : str
+            doc_keys : list, default None (document keys, e.g. full_pk)
+
+        Returns:
+            None
+        """
+        matrix = self.to_sparse()
+        arrays = {'format': matrix.format.encode('ascii'), 'shape': np.array(matrix.shape), 'data': matrix.data, 
+                  'indices': matrix.indices, 'indptr': matrix.indptr, 'labels': np.asarray(self.vocabulary, dtype=str)}
+        if doc_keys is not None:
+            arrays['doc_keys'] = np.asarray(list(doc_keys), dtype=str)
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        np.savez_compressed(file_path, **arrays)
+
+    @classmethod
+    def load_npz(cls, file_path):
+        """
+        To load the tag lists saved by save_npz (to_sparse returns the 
+        indicator matrix, e.g. the multi-label targets of a classifier)
+
+        Args:
+            file_path : str
+
+        Returns:
+            tag_lists, list (document keys, None if not saved)
+        """
+        with np.load(file_path, allow_pickle=False) as npz:
+            doc_keys = npz['doc_keys'].tolist() if 'doc_keys' in npz.files else None
+            labels = npz['labels'].tolist()
+        return cls.from_sparse(load_npz(file_path), labels), doc_keys
+
+    def to_lists(self, default=None):
+        """
+        To build the Python lists of tag names
+
+        Args:
+            default : list, default None (tags of the documents without tags)
+
+        Returns:
+            list of list
+        """
+        names = self.vocabulary[self.codes].tolist()
+        offsets = self.offsets.tolist()
+        return [names[i:j] if j > i or default is None else list(default) for i, j in zip(offsets[:-1], offsets[1:])]
@@ -10,24 +10,186 @@ from unidecode import unidecode
 from nltk.stem.porter import PorterStemmer
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-from nltk import pos_tag
+from nltk import pos_tag, pos_tag_sents
 from flashtext import KeywordProcessor
-from gensim.models import Phrases
-from gensim.models.phrases import Phraser
 import os
 import os.path
-
-global df_unique_rock_artists, df_dict_category, df_add_keywords
+from functools import lru_cache, partial
+from collections import OrderedDict, deque
+from multiprocessing import Pool
+from itertools import islice
+from time import time
+import pickle
 
 path_parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-path_data_support_files = os.path.join(path_parent_dir, 'data', 'support_files')
+path_data = os.environ.get('ROCK_NEWS_NLP_DATA_ROOT', os.path.join(path_parent_dir, 'data'))
+
+support_data_cache = {}
+support_data_loaders = {
+    'df_dict_category': lambda: read_support_file('support_text_class_news_category_dict.csv'),
+    'df_add_keywords': lambda: read_support_file('support_text_class_news_category_add_keywords.csv'),
+    'set_keyword': lambda: set(load_support_data('df_dict_category')['keyword']) | set(load_support_data('df_add_keywords')['keyword']),
+    'set_keyword_lda': lambda: set(i for i in load_support_data('set_keyword') if i!='new'),
+    'set_rock_artist_name': lambda: set(read_support_file('support_identified_rock_artists.csv')['rock_artist']),
+    'stop_words': lambda: set(stopwords.words('english'))}
+
+def set_data_root(path):
+    """
+    To set the data directory of the support files (also inherited by the 
+    worker processes through the ROCK_NEWS_NLP_DATA_ROOT environment variable)
+    and drop the support data loaded so far
+    
+    Args:
+        path : str
+		
+    Returns:
+	None
+    """
+    global path_data
+    path_data = path
+    os.environ['ROCK_NEWS_NLP_DATA_ROOT'] = path
+    reload_support_data()
+
+def support_file_path(file_name):
+    """
+    To return the path of a support file
+    
+    Args:
+        file_name : str
+		
+    Returns:
+	str
+    """
+    return os.path.join(path_data, 'support_files', file_name)
+
+def read_support_file(file_name):
+    """
+    To read a support file in CSV format
+    
+    Args:
+        file_name : str
+		
+    Returns:
+	DataFrame
+    """
+    return pd.read_csv(support_file_path(file_name), sep=';')
+
+def load_support_data(name, reload=False):
+    """
+    To load a support dictionary on first use and cache it once per process
+    
+    Args:
+        name : str (key of support_data_loaders)
+        reload : bool
+		
+    Returns:
+	DataFrame or set
+    """
+    if reload or name not in support_data_cache:
+        support_data_cache[name] = support_data_loaders[name]()
+    return support_data_cache[name]
+
+def reload_support_data():
+    """
+    To drop the cached support data, so that it is read again on next use
+		
+    Returns:
+	None
+    """
+    support_data_cache.clear()
+
+class support_attribute:
+    """
+    Class attribute of text_preprocessing loaded lazily from the support data
+    """
+    
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        return load_support_data(self.name)
+
+class stem_cache:
+    """
+    Porter stemmer backed by a size-bounded memo table (least recently used 
+    words are evicted first), so that every distinct word is stemmed once per
+    process
+    """
+    
+    def __init__(self, maxsize=100000):
+        self.stemmer = PorterStemmer()
+        self.maxsize = maxsize
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def stem(self, word):
+        """
+        To return the stem of a word from the memo table, stemming it on a miss
+        
+        Args:
+            word : str
+		
+	Returns:
+	    str
+        """
+        try:
+            stem = self.table[word]
+            self.table.move_to_end(word)
+            self.hits += 1
+        except KeyError:
+            stem = self.stemmer.stem(word)
+            self.table[word] = stem
+            self.misses += 1
+            if len(self.table) > self.maxsize:
+                self.table.popitem(last=False)
+        return stem
+
+    def cache_info(self):
+        """
+        To report the usage of the memo table
+        
+	Returns:
+	    dict
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'maxsize': self.maxsize, 'currsize': len(self.table)}
 
-df_unique_rock_artists = pd.read_csv(f'{path_data_support_files}\\support_identified_rock_artists.csv', sep=';')
-df_dict_category = pd.read_csv(f'{path_data_support_files}\\support_text_class_news_category_dict.csv',sep=';')
-df_add_keywords = pd.read_csv(f'{path_data_support_files}\\support_text_class_news_category_add_keywords.csv',sep=';')
+    def save(self, path, file_name):
+        """
+        To save the memo table to file (e.g. alongside the pickled models)
+        
+        Args:
+            path : str
+            file_name : str
+		
+	Returns:
+	    Write the pickled representation of the memo table to file
+        """
+        with open(os.path.join(path, file_name), 'wb') as f:
+            pickle.dump(dict(self.table), f)
+
+    def load(self, path, file_name):
+        """
+        To warm up the memo table from file, if it exists
+        
+        Args:
+            path : str
+            file_name : str
+		
+	Returns:
+	    bool
+        """
+        file_path = os.path.join(path, file_name)
+        if not os.path.exists(file_path):
+            return False
+        with open(file_path, 'rb') as f:
+            self.table.update(pickle.load(f))
+        while len(self.table) > self.maxsize:
+            self.table.popitem(last=False)
+        return True
 
 class text_preprocessing:     
-    stop_words = set(stopwords.words('english'))
+    stop_words = support_attribute('stop_words')
     additional_stop_words = set(['kerrang','2022','2023','rock','roll','metal','years','ago','london','time'])
     dict_keyword = {'releas': ['drop','unleash','share','premier','launch'],
                     'announc': ['unveil','reveal'],
@@ -39,11 +201,16 @@ class text_preprocessing:
                                 'think': ['thought'], 
                                 'rrhof': ['rock hall', 'rock and roll hall of fame', 'roll hall of fame'],
                                 'death': ['dead', 'die', 'dies', 'died']}
-    set_keyword = set(df_dict_category['keyword']) | set(df_add_keywords['keyword'])
-    set_keyword_lda = set(i for i in set_keyword if i!='new')
-    set_rock_artist_name = set(df_unique_rock_artists['rock_artist'])  
-    keyword_processor = KeywordProcessor(case_sensitive=True)
-    ps = PorterStemmer()
+    set_keyword = support_attribute('set_keyword')
+    set_keyword_lda = support_attribute('set_keyword_lda')
+    set_rock_artist_name = support_attribute('set_rock_artist_name')
+    keyword_processors = {}
+    stemmer = stem_cache()
+    pos_tag_mode = 'batch'
+    noun_verb_cache = {}
+    noun_verb_cache_min_count = 5
+    n_workers = 1
+    chunk_size = 1000
        
     def __init__(self, text):
         self.text = text
@@ -98,13 +265,37 @@ class text_preprocessing:
         
         Args:
             text : str
-            dict_key_words : dict
+            dict_key_words : dict or KeywordProcessor (see get_keyword_processor)
 		
 	Returns:
 	    str
         """      
-        text_preprocessing.keyword_processor.add_keywords_from_dict(dict_keyword)
-        return text_preprocessing.keyword_processor.replace_keywords(self)
+        if not isinstance(dict_keyword, KeywordProcessor):
+            dict_keyword = text_preprocessing.get_keyword_processor(dict_keyword)
+        return dict_keyword.replace_keywords(self)
+
+    @staticmethod
+    def get_keyword_processor(dict_keyword):
+        """
+        To return the flashtext KeywordProcessor of a replacement dictionary 
+        
+        Every dictionary gets its own KeywordProcessor, built once and kept in
+        a registry keyed by the dictionary contents, so that the replacements
+        of one dictionary never leak into another.
+        
+        Args:
+            dict_keyword : dict
+		
+	Returns:
+	    KeywordProcessor
+        """
+        key = tuple((k, tuple(v)) for k, v in dict_keyword.items())
+        keyword_processor = text_preprocessing.keyword_processors.get(key)
+        if keyword_processor is None:
+            keyword_processor = KeywordProcessor(case_sensitive=True)
+            keyword_processor.add_keywords_from_dict(dict_keyword)
+            text_preprocessing.keyword_processors[key] = keyword_processor
+        return keyword_processor
     
     def remove_keywords(self, new_text, words_to_remove):
         """
@@ -113,13 +304,84 @@ class text_preprocessing:
         Args:
             text : str
             new_text : str
-            words_to_remove : set
+            words_to_remove : set or re.Pattern (see compile_keywords_pattern)
 		
 	Returns:
 	    str
         """              
-        pat = r'\b(?:{})\b'.format('|'.join(words_to_remove))
-        return re.sub(pat, new_text, self)
+        if not isinstance(words_to_remove, re.Pattern):
+            words_to_remove = text_preprocessing.compile_keywords_pattern(frozenset(words_to_remove))
+        return words_to_remove.sub(new_text, self)
+
+    @staticmethod
+    def trie_regex(words):
+        """
+        To build a regex alternation shaped as a character trie, so that the 
+        regex engine never backtracks over the shared prefixes of the words 
+        and the longest word is matched first
+        
+        Args:
+            words : set
+		
+	Returns:
+	    str
+        """
+        trie = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def node_regex(node):
+            if list(node) == ['']:
+                return ''
+            branches = [re.escape(char) + node_regex(node[char]) for char in sorted(node) if char != '']
+            if len(branches) == 1:
+                pat = branches[0]
+            elif all(len(i) == 1 for i in branches):
+                pat = '[{}]'.format(''.join(branches))
+            else:
+                pat = '(?:{})'.format('|'.join(branches))
+            if '' in node:
+                pat = f'{pat}?' if len(branches) > 1 or len(pat) == 1 else f'(?:{pat})?'
+            return pat
+
+        return node_regex(trie)
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def compile_keywords_pattern(words):
+        """
+        To compile a set of whole words into a trie-shaped regex, cached by 
+        the contents of the set
+        
+        Args:
+            words : frozenset
+		
+	Returns:
+	    re.Pattern
+        """
+        words = [i for i in words if i]
+        if not words:
+            return re.compile(r'(?!)')
+        return re.compile(r'\b(?:{})\b'.format(text_preprocessing.trie_regex(words)))
+
+    @staticmethod
+    def rock_artist_name_pattern():
+        """
+        To return the compiled pattern of the identified rock artists names, 
+        reloading support_identified_rock_artists.csv whenever it changes on 
+        disk
+        
+	Returns:
+	    re.Pattern
+        """
+        mtime = os.path.getmtime(support_file_path('support_identified_rock_artists.csv'))
+        if mtime != support_data_cache.get('rock_artist_name_mtime'):
+            load_support_data('set_rock_artist_name', reload=True)
+            support_data_cache['rock_artist_name_mtime'] = mtime
+        return text_preprocessing.compile_keywords_pattern(frozenset(text_preprocessing.set_rock_artist_name))
         
     def token(self):
         """
@@ -148,7 +410,130 @@ class text_preprocessing:
 	    list of substrings			
         """
         tags = pos_tag(tokens)
-        return [i for (i,j) in tags if ((j in ('NN','NNS') or j.startswith('V')) and i!='Bandname') or i in set_keyword]
+        return [i for (i,j) in tags if text_preprocessing.is_noun_verb(i,j) or i in set_keyword]
+
+    @staticmethod
+    def is_noun_verb(token, tag):
+        """
+        To check whether a POS tagged token is a common noun or a verb
+        
+        Args:
+            token : str
+            tag : str
+		
+	Returns:
+	    bool
+        """
+        return (tag in ('NN','NNS') or tag.startswith('V')) and token!='Bandname'
+
+    @staticmethod
+    def cached_noun_verb(token):
+        """
+        To return the noun/verb decision of an unambiguous token, i.e. a token 
+        tagged at least noun_verb_cache_min_count times and always with the 
+        same decision
+        
+        Args:
+            token : str
+		
+	Returns:
+	    bool or None (token not cached or ambiguous)
+        """
+        counts = text_preprocessing.noun_verb_cache.get(token)
+        if counts is None or sum(counts) < text_preprocessing.noun_verb_cache_min_count or min(counts) > 0:
+            return None
+        return counts[0] > 0
+
+    @staticmethod
+    def get_noun_verb_batch(lst_tokens, set_keyword, use_cache=False):
+        """
+        To extract common nouns and verbs of a batch of texts with a single 
+        call to the POS tagger
+        
+        If use_cache is True, texts whose tokens are all unambiguous in the 
+        noun/verb cache skip the POS tagger, and the decisions of the tagged 
+        texts are recorded in the cache.
+        
+        Args:
+            lst_tokens : list of lists
+            set_keyword : set
+            use_cache : bool
+		
+	Returns:
+	    list of lists of substrings			
+        """
+        lst_noun_verb = [None] * len(lst_tokens)
+        index_to_tag = []
+        for n, tokens in enumerate(lst_tokens):
+            if use_cache:
+                decisions = [text_preprocessing.cached_noun_verb(i) for i in tokens]
+                if None not in decisions:
+                    lst_noun_verb[n] = [i for i, j in zip(tokens, decisions) if j or i in set_keyword]
+                    continue
+            index_to_tag.append(n)
+        
+        for n, tags in zip(index_to_tag, pos_tag_sents([lst_tokens[n] for n in index_to_tag])):
+            decisions = [text_preprocessing.is_noun_verb(i,j) for (i,j) in tags]
+            if use_cache:
+                for (i,j), k in zip(tags, decisions):
+                    text_preprocessing.noun_verb_cache.setdefault(i, [0, 0])[0 if k else 1] += 1
+            lst_noun_verb[n] = [i for (i,j), k in zip(tags, decisions) if k or i in set_keyword]
+        return lst_noun_verb
+
+    @staticmethod
+    def noun_verb_stage(set_keyword, pos_tag_mode=None):
+        """
+        To return the pipeline stage extracting common nouns and verbs 
+        according to the POS tagging mode: 'document' (one tagger call per 
+        text), 'batch' (one tagger call per batch of texts) or 'cached' 
+        (batch plus the noun/verb cache of unambiguous tokens)
+        
+        Args:
+            set_keyword : set
+            pos_tag_mode : str, default text_preprocessing.pos_tag_mode
+		
+	Returns:
+	    callable or batch_stage
+        """
+        if pos_tag_mode is None:
+            pos_tag_mode = text_preprocessing.pos_tag_mode
+        if pos_tag_mode == 'document':
+            return partial(text_preprocessing.get_noun_verb, set_keyword=set_keyword)
+        if pos_tag_mode in ('batch', 'cached'):
+            return batch_stage(partial(text_preprocessing.get_noun_verb_batch, set_keyword=set_keyword, use_cache=pos_tag_mode=='cached'))
+        raise ValueError(f"Unknown POS tagging mode: {pos_tag_mode}")
+
+    @staticmethod
+    def compare_pos_tag_modes(lst_tokens, set_keyword, pos_tag_mode='cached', batch_size=1000):
+        """
+        To compare the accuracy and the speed of a POS tagging mode against the
+        per-document POS tagging
+        
+        Args:
+            lst_tokens : list of lists
+            set_keyword : set
+            pos_tag_mode : str
+            batch_size : int
+		
+	Returns:
+	    dict
+        """
+        t_start = time()
+        lst_reference = [text_preprocessing.get_noun_verb(i, set_keyword) for i in lst_tokens]
+        t_reference = time() - t_start
+        
+        t_start = time()
+        lst_noun_verb = list(text_preprocessing_pipeline([text_preprocessing.noun_verb_stage(set_keyword, pos_tag_mode)])
+                             .transform(lst_tokens, batch_size=batch_size))
+        t_mode = time() - t_start
+        
+        nr_tokens = sum(len(i) for i in lst_tokens)
+        nr_token_errors = sum(len(set(i) ^ set(j)) for i, j in zip(lst_reference, lst_noun_verb))
+        return {'pos_tag_mode': pos_tag_mode,
+                'text_accuracy': sum(i==j for i, j in zip(lst_reference, lst_noun_verb)) / max(len(lst_tokens), 1),
+                'token_accuracy': 1 - nr_token_errors / max(nr_tokens, 1),
+                'document_time': t_reference,
+                'mode_time': t_mode}
     
     @staticmethod    
     def stem_word(tokens):
@@ -161,77 +546,313 @@ class text_preprocessing:
 	Returns:
 	    list of substrings			
         """
-        stem_tokens = [text_preprocessing.ps.stem(word) for word in tokens if len(text_preprocessing.ps.stem(word))>2]
-        return stem_tokens
+        stem_tokens = [text_preprocessing.stemmer.stem(word) for word in tokens]
+        return [i for i in stem_tokens if len(i)>2]
+
+    @staticmethod
+    def fit_bigrams(tokens, min_count=20, threshold=100):
+        """
+        To train a bigram model (sequence of two adjacent words) which can 
+        later be updated with new texts
+        
+        Args:
+            tokens : iterable of lists
+            min_count : int
+            threshold : float
+		
+	Returns:
+	    models.phrases.Phrases
+        """
+        from gensim.models import Phrases
+        
+        return Phrases(tokens, min_count=min_count, threshold=threshold)
+
+    @staticmethod
+    def update_bigrams(bigram, tokens):
+        """
+        To update a trained bigram model with the vocabulary of new texts 
+        instead of training it again on the whole corpus
+        
+        Args:
+            bigram : models.phrases.Phrases
+            tokens : iterable of lists
+		
+	Returns:
+	    models.phrases.Phrases
+        """
+        bigram.add_vocab(tokens)
+        return bigram
+
+    @staticmethod
+    def freeze_bigrams(bigram):
+        """
+        To freeze a trained bigram model into a smaller and faster model, 
+        used for inference
+        
+        Args:
+            bigram : models.phrases.Phrases
+		
+	Returns:
+	    models.phrases.Phraser
+        """
+        from gensim.models.phrases import Phraser
+        
+        return Phraser(bigram)
+
+    @staticmethod
+    def apply_bigrams(tokens, bigram_model):
+        """
+        To join the bigrams of a text according to a bigram model
+        
+        Args:
+            tokens : list
+            bigram_model : models.phrases.Phraser
+		
+	Returns:
+	    list of substrings	
+        """
+        return bigram_model[tokens]
 
     @staticmethod        
-    def make_bigrams(tokens):
+    def make_bigrams(tokens, bigram_model=None):
         """
-        To create bigram model (sequence of two adjacent words)
+        To create bigrams (sequence of two adjacent words) with a trained 
+        bigram model or, if none is given, with a bigram model trained on the
+        given texts
         
         Args:
             tokens : list
+            bigram_model : models.phrases.Phraser
 		
 	Returns:
 	    list of substrings	
         """
-        bigram = Phrases(tokens, min_count=20, threshold=100)
-        bigram_model = Phraser(bigram)
+        if bigram_model is None:
+            bigram_model = text_preprocessing.freeze_bigrams(text_preprocessing.fit_bigrams(tokens))
         return [bigram_model[i] for i in tokens]
 
-    def text_preprocessing_prep(lst):
+    def replace_empty_text(self, new_text):
+        """
+        To replace an empty text (e.g. no words left after text preprocessing)
+        
+        Args:
+            text : str
+            new_text : str
+		
+	Returns:
+	    str
+        """
+        return new_text if bool(self)==False else self
+
+    def pipeline_prep():
+        """
+        To configure the preliminary text preprocessing tasks regarding the 
+        LDA models
+        
+    	Returns:
+    	    text_preprocessing_pipeline
+        """
+        rock_artist_name_pattern = text_preprocessing.rock_artist_name_pattern()
+        synonym_processor = text_preprocessing.get_keyword_processor(text_preprocessing.dict_synonym_replacement)
+        return text_preprocessing_pipeline([str.lower,
+                                            partial(text_preprocessing.replace_keywords, dict_keyword=synonym_processor),
+                                            text_preprocessing.remove_punctuation,
+                                            partial(text_preprocessing.remove_keywords, new_text='Bandname', words_to_remove=rock_artist_name_pattern),
+                                            partial(text_preprocessing.remove_stopwords, additional_stop_words=text_preprocessing.additional_stop_words),
+                                            text_preprocessing.token])
+
+    def pipeline_keyword_stem(set_keyword):
+        """
+        To configure the extraction of common nouns and verbs, the stemming and 
+        the replacement of keywords shared by the remaining text preprocessing 
+        tasks
+        
+        Args:
+            set_keyword : set
+    		
+    	Returns:
+    	    text_preprocessing_pipeline
+        """
+        keyword_processor = text_preprocessing.get_keyword_processor(text_preprocessing.dict_keyword)
+        return text_preprocessing_pipeline([text_preprocessing.noun_verb_stage(set_keyword),
+                                            text_preprocessing.stem_word,
+                                            ' '.join,
+                                            partial(text_preprocessing.replace_keywords, dict_keyword=keyword_processor)])
+
+    def pipeline_to_sklearn():
+        """
+        To configure the text preprocessing techniques for the Sklearn LDA model
+        
+     	Returns:
+    	    text_preprocessing_pipeline
+        """
+        return text_preprocessing.pipeline_prep().then(text_preprocessing.pipeline_keyword_stem(text_preprocessing.set_keyword_lda))
+
+    def pipeline_to_gensim(bigram_model=None):
+        """
+        To configure the remaining text preprocessing techniques for the Gensim
+        LDA model, applied to the output of pipeline_prep (the bigrams are only
+        joined if a bigram model is given)
+        
+        Args:
+            bigram_model : models.phrases.Phraser
+    		
+     	Returns:
+    	    text_preprocessing_pipeline
+        """
+        stages = [] if bigram_model is None else [partial(text_preprocessing.apply_bigrams, bigram_model=bigram_model)]
+        return text_preprocessing_pipeline(stages).then(text_preprocessing.pipeline_keyword_stem(text_preprocessing.set_keyword_lda), 
+                                                        text_preprocessing.token)
+
+    def pipeline_prep_to_gensim(bigram_model):
+        """
+        To configure all the text preprocessing techniques for the Gensim LDA 
+        model with a trained bigram model
+        
+        Args:
+            bigram_model : models.phrases.Phraser
+    		
+     	Returns:
+    	    text_preprocessing_pipeline
+        """
+        return text_preprocessing.pipeline_prep().then(text_preprocessing.pipeline_to_gensim(bigram_model))
+
+    def pipeline_rule_based_txt_class_prep():
+        """
+        To configure the preliminary text preprocessing tasks of the rule-based 
+        text classification
+        
+    	Returns:
+    	    text_preprocessing_pipeline
+        """
+        synonym_processor = text_preprocessing.get_keyword_processor(text_preprocessing.dict_synonym_replacement)
+        return text_preprocessing_pipeline([str.lower,
+                                            partial(re.sub, "’", "'"),
+                                            partial(text_preprocessing.replace_keywords, dict_keyword=synonym_processor)])
+
+    def pipeline_rule_based_txt_class(set_keyword=None):
+        """
+        To configure the essential text preprocessing techniques of the 
+        rule-based text classification
+        
+        Args:
+            set_keyword : set, default text_preprocessing.set_keyword
+    		
+    	Returns:
+    	    text_preprocessing_pipeline
+        """
+        if set_keyword is None:
+            set_keyword = text_preprocessing.set_keyword
+        rock_artist_name_pattern = text_preprocessing.rock_artist_name_pattern()
+        return text_preprocessing_pipeline([text_preprocessing.remove_punctuation,
+                                            partial(text_preprocessing.remove_keywords, new_text='Bandname', words_to_remove=rock_artist_name_pattern),
+                                            partial(text_preprocessing.remove_stopwords, additional_stop_words=text_preprocessing.additional_stop_words),
+                                            text_preprocessing.token]).then(text_preprocessing.pipeline_keyword_stem(set_keyword))
+
+    def pipeline_multi_label_class():
+        """
+        To configure the essential text preprocessing techniques for a 
+        multilabel classification task    
+        
+    	Returns:
+    	    text_preprocessing_pipeline
+        """
+        set_target_keyword = set(load_support_data('df_dict_category')['keyword'])
+        return (text_preprocessing.pipeline_rule_based_txt_class_prep()
+                .then(text_preprocessing.pipeline_rule_based_txt_class(set_target_keyword))
+                .then(partial(text_preprocessing.replace_empty_text, new_text='no words after text preprocessing')))
+
+    def run_pipeline(pipeline_name, lst, *args, n_workers=None, chunk_size=None):
+        """
+        To lazily run a configured pipeline (see the pipeline_* methods) over a 
+        text corpus, either in this process or in a pool of worker processes
+        
+        Every worker builds its own copy of the pipeline (stemmer, POS tagger, 
+        keyword processors, ...) once, when it starts, and only the chunks of 
+        texts are sent to the workers. The order of the texts is preserved and
+        at most two chunks per worker are in flight at any time. On platforms 
+        using the spawn start method (e.g. Windows), the calling script must be
+        guarded by if __name__ == "__main__".
+        
+        Args:
+            pipeline_name : str (e.g. 'prep' for pipeline_prep)
+            lst : iterable
+            args : arguments of the pipeline_* method
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
+    		
+    	Yields:
+    	    str or list of substrings
+        """
+        n_workers = n_workers or text_preprocessing.n_workers
+        chunk_size = chunk_size or text_preprocessing.chunk_size
+        if n_workers <= 1:
+            yield from getattr(text_preprocessing, f'pipeline_{pipeline_name}')(*args).transform(lst, batch_size=chunk_size)
+            return
+        
+        iterator = iter(lst)
+        pending = deque()
+        with Pool(n_workers, initializer=init_worker_pipeline, initargs=(pipeline_name, args)) as pool:
+            for chunk in iter(lambda: list(islice(iterator, chunk_size)), []):
+                pending.append(pool.apply_async(run_worker_pipeline, (chunk,)))
+                if len(pending) >= 2 * n_workers:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
+    def text_preprocessing_prep(lst, n_workers=None, chunk_size=None):
         """
         To execute preliminary text preprocessing tasks regarding the LDA models
         
         Args:
             lst : list         
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
     	Returns:
     	    list
         """     
-        lst_txt_temp = [i.lower() for i in lst]
-        lst_txt_temp = [text_preprocessing.replace_keywords(i,text_preprocessing.dict_synonym_replacement) 
-                        for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_punctuation(i) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_keywords(i,'Bandname',text_preprocessing.set_rock_artist_name) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_stopwords(i,text_preprocessing.additional_stop_words) for i in lst_txt_temp]
-        return [text_preprocessing.token(i) for i in lst_txt_temp]   
+        return list(text_preprocessing.run_pipeline('prep', lst, n_workers=n_workers, chunk_size=chunk_size))
 
-    def text_preprocessing_to_sklearn(lst):
+    def text_preprocessing_to_sklearn(lst, n_workers=None, chunk_size=None):
         """
         To execute the remaining text preprocessing techniques for the Sklearn
         LDA model
         
         Args:
             lst : list         
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
      	Returns:
     	    list
         """
-        lst_txt_temp = text_preprocessing.text_preprocessing_prep(lst)
-        lst_txt_temp = [text_preprocessing.get_noun_verb(i, text_preprocessing.set_keyword_lda) for i in  lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.stem_word(i) for i in lst_txt_temp]
-        return [text_preprocessing.replace_keywords(' '.join(i), text_preprocessing.dict_keyword) for i in lst_txt_temp]
+        return list(text_preprocessing.run_pipeline('to_sklearn', lst, n_workers=n_workers, chunk_size=chunk_size))
 
-    def text_preprocessing_to_gensim(lst):
+    def text_preprocessing_to_gensim(lst, bigram_model=None, n_workers=None, chunk_size=None):
         """
         To execute the remaining text preprocessing techniques for the Gensim
         LDA model
         
+        The bigram model fitted on the training set must be given for 
+        inference, otherwise a bigram model is trained on the given texts.
+        
         Args:
             lst : list         
+            bigram_model : models.phrases.Phraser
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
      	Returns:
     	    list
         """
-        lst_txt_temp = text_preprocessing.text_preprocessing_prep(lst)
-        lst_txt_temp = text_preprocessing.make_bigrams(lst_txt_temp) 
-        lst_txt_temp = [text_preprocessing.get_noun_verb(i, text_preprocessing.set_keyword_lda) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.stem_word(i) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.replace_keywords(' '.join(i), text_preprocessing.dict_keyword) for i in lst_txt_temp]
-        return [text_preprocessing.token(i) for i in lst_txt_temp]
+        if bigram_model is not None:
+            return list(text_preprocessing.run_pipeline('prep_to_gensim', lst, bigram_model, n_workers=n_workers, chunk_size=chunk_size))
+        lst_txt_temp = text_preprocessing.text_preprocessing_prep(lst, n_workers=n_workers, chunk_size=chunk_size)
+        bigram_model = text_preprocessing.freeze_bigrams(text_preprocessing.fit_bigrams(lst_txt_temp))
+        return list(text_preprocessing.run_pipeline('to_gensim', lst_txt_temp, bigram_model, n_workers=n_workers, chunk_size=chunk_size))
        
-    def text_preprocessing_rule_based_txt_class_prep(lst):
+    def text_preprocessing_rule_based_txt_class_prep(lst, n_workers=None, chunk_size=None):
         """
         To execute preliminary text preprocessing tasks 
         
@@ -241,55 +862,159 @@ class text_preprocessing:
         
         Args:
             lst : list         
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
     	Returns:
     	    list
         """  
-        lst_txt_temp = [i.lower() for i in lst]
-        lst_txt_temp = [re.sub("’", "'", i) for i in lst_txt_temp]
-        lst_txt = [text_preprocessing.replace_keywords(i,text_preprocessing.dict_synonym_replacement) for i in lst_txt_temp]
-        return lst_txt
+        return list(text_preprocessing.run_pipeline('rule_based_txt_class_prep', lst, n_workers=n_workers, chunk_size=chunk_size))
 
-    def text_preprocessing_rule_based_txt_class(lst):
+    def text_preprocessing_rule_based_txt_class(lst, n_workers=None, chunk_size=None):
         """
         To execute the essential text preprocessing techniques      
         
         Args:
             lst : list         
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
     	Returns:
     	    list
         """
-        lst_txt_temp = [text_preprocessing.remove_punctuation(i) for i in lst]
-        lst_txt_temp = [text_preprocessing.remove_keywords(i,'Bandname',text_preprocessing.set_rock_artist_name) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_stopwords(i,text_preprocessing.additional_stop_words) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.token(i) for i in lst_txt_temp]   
-        lst_txt_temp = [text_preprocessing.get_noun_verb(i, text_preprocessing.set_keyword) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.stem_word(i) for i in lst_txt_temp]
-        lst_txt = [text_preprocessing.replace_keywords(' '.join(i), text_preprocessing.dict_keyword) for i in lst_txt_temp]
-        return lst_txt
+        return list(text_preprocessing.run_pipeline('rule_based_txt_class', lst, n_workers=n_workers, chunk_size=chunk_size))
 
-    def text_preprocessing_multi_label_class(lst):
+    def text_preprocessing_multi_label_class(lst, n_workers=None, chunk_size=None):
         """
         To execute the essential text preprocessing techniques for a multilabel classification task    
         
         Args:
             lst : list         
+            n_workers : int, default text_preprocessing.n_workers
+            chunk_size : int, default text_preprocessing.chunk_size
     		
     	Returns:
     	    list
         """
-        set_target_keyword = set(df_dict_category['keyword'])
-                
-        lst_txt_temp = [i.lower() for i in lst]
-        lst_txt_temp = [re.sub("’", "'", i) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.replace_keywords(i,text_preprocessing.dict_synonym_replacement) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_punctuation(i) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_keywords(i,'Bandname',text_preprocessing.set_rock_artist_name) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.remove_stopwords(i,text_preprocessing.additional_stop_words) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.token(i) for i in lst_txt_temp]   
-        lst_txt_temp = [text_preprocessing.get_noun_verb(i, set_target_keyword) for i in lst_txt_temp]   
-        lst_txt_temp = [text_preprocessing.stem_word(i) for i in lst_txt_temp]
-        lst_txt_temp = [text_preprocessing.replace_keywords(' '.join(i), text_preprocessing.dict_keyword) for i in lst_txt_temp]
-        lst_txt = ['no words after text preprocessing' if bool(i)==False else i for i in lst_txt_temp]
-        return lst_txt
+        return list(text_preprocessing.run_pipeline('multi_label_class', lst, n_workers=n_workers, chunk_size=chunk_size))
+
+class batch_stage:
+    """
+    Stage of a text_preprocessing_pipeline which processes a batch of 
+    documents at once (e.g. POS tagging)
+    """
+    
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, lst):
+        return self.function(lst)
+
+class text_preprocessing_pipeline:
+    """
+    Composable text preprocessing pipeline which runs all its stages on a 
+    bounded batch of documents at a time
+    
+    Every stage is a callable taking the output of the previous stage (one 
+    document, or a list of documents for a batch_stage), so the corpus is 
+    never copied between stages and peak memory does not grow with the size 
+    of the corpus.
+    """
+    
+    def __init__(self, stages, batch_size=1000):
+        self.stages = list(stages)
+        self.batch_size = batch_size
+
+    def __call__(self, text):
+        """
+        To run every stage of the pipeline on a single document
+        
+        Args:
+            text : str
+		
+	Returns:
+	    str or list of substrings
+        """
+        return self.run_batch([text])[0]
+
+    def run_batch(self, lst):
+        """
+        To run every stage of the pipeline on a batch of documents
+        
+        Args:
+            lst : list
+		
+	Returns:
+	    list
+        """
+        for stage in self.stages:
+            lst = stage(lst) if isinstance(stage, batch_stage) else [stage(i) for i in lst]
+        return lst
+
+    def then(self, *stages):
+        """
+        To return a new pipeline extended with further stages or pipelines
+        
+        Args:
+            stages : callable, batch_stage or text_preprocessing_pipeline
+		
+	Returns:
+	    text_preprocessing_pipeline
+        """
+        stages = [j for i in stages for j in (i.stages if isinstance(i, text_preprocessing_pipeline) else [i])]
+        return text_preprocessing_pipeline(self.stages + stages, self.batch_size)
+
+    def transform(self, lst, batch_size=None):
+        """
+        To lazily run the pipeline over a text corpus, batch by batch
+        
+        Args:
+            lst : iterable
+            batch_size : int, default self.batch_size
+		
+	Yields:
+	    str or list of substrings
+        """
+        iterator = iter(lst)
+        while True:
+            batch = list(islice(iterator, batch_size or self.batch_size))
+            if not batch:
+                return
+            yield from self.run_batch(batch)
+
+worker_pipeline = None
+
+def init_worker_pipeline(pipeline_name, args):
+    """
+    To build the pipeline of a worker process once, when the worker starts
+    
+    Args:
+        pipeline_name : str
+        args : tuple
+		
+    Returns:
+	None
+    """
+    global worker_pipeline
+    worker_pipeline = getattr(text_preprocessing, f'pipeline_{pipeline_name}')(*args)
+
+def run_worker_pipeline(chunk):
+    """
+    To run the pipeline of a worker process on a chunk of texts
+    
+    Args:
+        chunk : list
+		
+    Returns:
+	list
+    """
+    return worker_pipeline.run_batch(chunk)
+
+def main():
+    text_corpus = pd.read_csv(os.path.join(path_data, 'data_subsets', 'rock_news_train_set.csv'), sep=';', usecols=['title'])['title'].to_list()
+    lst_tokens = text_preprocessing.text_preprocessing_prep(text_corpus)
+    for i in ['batch', 'cached']:
+        print(text_preprocessing.compare_pos_tag_modes(lst_tokens, text_preprocessing.set_keyword_lda, i))
+
+if __name__ == "__main__":
+    main()
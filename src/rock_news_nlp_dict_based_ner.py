@@ -9,7 +9,8 @@ import numpy as np
 import os
 import os.path
 from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
-import rock_news_nlp_utilities as utils_tpp
+from rock_news_nlp_class_gazetteer_index import gazetteer_index
+from rock_news_nlp_class_tag_lists import tag_lists
 from time import time
 
 def text_preprocessing(lst):
@@ -23,8 +24,9 @@ def text_preprocessing(lst):
 	list
     """   
     
+    himband_processor = tpp.get_keyword_processor({'himband': ['HIM']})
     lst_txt_temp = [tpp.remove_punctuation(i) for i in lst]
-    lst_txt_temp = [tpp.replace_keywords(i, {'himband': ['HIM']}) for i in lst_txt_temp]
+    lst_txt_temp = [tpp.replace_keywords(i, himband_processor) for i in lst_txt_temp]
     lst_txt = [i.lower() for i in lst_txt_temp]
     return lst_txt
 
@@ -57,6 +59,9 @@ path_data = f'{path_parent_dir}\data'
 path_data_web_scrapers = f'{path_data}\web_scrapers'
 path_data_support_files = f'{path_data}\support_files'
 path_output_csv = f'{path_parent_dir}\output\csv'
+path_output_sparse = f'{path_parent_dir}\output\sparse'
+### SAVE THE TAGS ALSO AS SPARSE DOCUMENT X LABEL INDICATOR MATRICES (.npz)
+sparse_output = False
 
 df_rock_news = pd.read_csv(f'{path_data_web_scrapers}/rock_news.csv',sep=';')
 df_rock_artist_md = pd.read_csv(f'{path_data_web_scrapers}/rock_artist_masterdata.csv',sep=';')
@@ -67,7 +72,8 @@ df_dict_text_clean_support = pd.read_csv(f'{path_data_support_files}/support_dic
 ## ROCK ARTIST DICTIONARIES & SET
 df_rock_artist_md = df_rock_artist_md[~df_rock_artist_md['rock_artist'].isin(['The Band',"Sweet","!!!"])]
 list_rock_artist_clean = dfcol_to_list(df_rock_artist_md,'rock_artist')
-dict_rock_artist = dict(zip([tpp.replace_keywords(i, {'yesband': ['yes']}) for i in list_rock_artist_clean], df_rock_artist_md['rock_artist'].to_list()))
+yesband_processor = tpp.get_keyword_processor({'yesband': ['yes']})
+dict_rock_artist = dict(zip([tpp.replace_keywords(i, yesband_processor) for i in list_rock_artist_clean], df_rock_artist_md['rock_artist'].to_list()))
 set_rock_artist = set(dict_rock_artist.keys())
 ### ROCK ARTIST ADDITIONAL SET
 set_rock_artist_additional = set([i[4:len(i)] for i in list_rock_artist_clean if (i.startswith('the ') and 
@@ -86,52 +92,47 @@ corpus_title_desc = df_rock_news_subset['title_desc'].to_list()
 corpus_title_desc_clean = text_preprocessing(corpus_title_desc)
 ### ADDITIONAL TEXT PREPROCESSING TASKS 
 keyword_dict = df_dict_text_clean_support.groupby('values')['key'].agg(list).to_dict()
-corpus_title_desc_clean = [tpp.replace_keywords(i, keyword_dict) for i in corpus_title_desc_clean]
+text_clean_processor = tpp.get_keyword_processor(keyword_dict)
+corpus_title_desc_clean = [tpp.replace_keywords(i, text_clean_processor) for i in corpus_title_desc_clean]
 
 #==============================================================================
 # 2. IDENTIFY AND EXTRACT THE ROCK ARTIST AND THE ROCK ARTIST MEMBER
 #==============================================================================
 
 ## 2.1. ROCK ARTIST AND ROCK ARTIST MEMBER SEARCH ON THE TEXT CORPUS AND EXTRACTION 
-extracted_rock_artists = {'title_desc_clean': [], 'rock_artist_tags_prep': [], 'members_tags': []}
-extracted_rock_artists['title_desc_clean'].extend(corpus_title_desc_clean)
-extracted_rock_artists['rock_artist_tags_prep'].extend([[i for i in set_rock_artist if tpp.word_search(i,j)==True] for j in corpus_title_desc_clean])
-extracted_rock_artists['members_tags'].extend([[i for i in set_rock_artist_members if tpp.word_search(i,j)==True] for j in corpus_title_desc_clean])
-df_rock_artist_tags_prep = pd.DataFrame(extracted_rock_artists)
-df_temp_tags_null = df_rock_artist_tags_prep['title_desc_clean'][df_rock_artist_tags_prep['rock_artist_tags_prep'].str.len() == 0].to_frame()
-df_temp_tags_null['rock_artist_tags_add'] = df_temp_tags_null['title_desc_clean'].apply(lambda x: [f'the {i}' for i in set_rock_artist_additional if tpp.word_search(i,x)==True])
-df_temp_tags_null = df_temp_tags_null.iloc[:,np.r_[-1]].copy()
-df_rock_artist_tags_prep = df_rock_artist_tags_prep.join(df_temp_tags_null)
-utils_tpp.return_empty_list_from_nan(df_rock_artist_tags_prep,['rock_artist_tags_add'])
+### BUILD THE GAZETTEER INDEX ONCE AND SEARCH ALL THE DICTIONARIES IN A SINGLE PASS PER TEXT
+gazetteer = gazetteer_index()
+gazetteer.add_keywords('rock_artist_tags_prep', set_rock_artist)
+gazetteer.add_keywords('rock_artist_tags_add', {i: f'the {i}' for i in set_rock_artist_additional})
+gazetteer.add_keywords('members_tags', set_rock_artist_members)
+gazetteer.build()
+list_gazetteer_matches = [gazetteer.search(i) for i in corpus_title_desc_clean]
+
+rock_artist_tags_prep = tag_lists.from_lists([i['rock_artist_tags_prep'] for i in list_gazetteer_matches])
+### THE ADDITIONAL ROCK ARTISTS ARE ONLY SEARCHED ON TEXTS WITHOUT IDENTIFIED ROCK ARTISTS
+rock_artist_tags_add = tag_lists.from_lists([[] if i['rock_artist_tags_prep'] else i['rock_artist_tags_add'] for i in list_gazetteer_matches])
+members_tags = tag_lists.from_lists([i['members_tags'] for i in list_gazetteer_matches])
 
 ## 2.2. RETURN THE BANDS OF THE IDENTIFIED MEMBERS AND REVISE PREVIOUSLY MANIPULATED ROCK ARTISTS NAMES
-for i in ['rock_artist_tags_prep','rock_artist_tags_add','members_tags']:
-    globals()[f'{i}_exploded'] = df_rock_artist_tags_prep[f'{i}'][df_rock_artist_tags_prep[f'{i}'].str.len()>0].copy()
-    globals()[f'{i}_exploded'] = globals()[f'{i}_exploded'].to_frame().explode(i)
-    globals()[f'{i}_exploded']['index_1'] = globals()[f'{i}_exploded'].index
-
-df_members_temp = rock_artist_tags_prep_exploded.merge(rock_artist_tags_add_exploded,how="outer",on='index_1').merge(members_tags_exploded,how="outer",on='index_1') 
-df_members_temp['rock_artist_tags_prep'] = df_members_temp['rock_artist_tags_prep'].map(dict_rock_artist)
-df_members_temp['rock_artist_tags_add'] = df_members_temp['rock_artist_tags_add'].map(dict_rock_artist)
-df_members_temp['tags_rock_artist_from_member_tags'] = df_members_temp['members_tags'].map(dict_rock_artist_members).str[1]
-df_members_temp['members_tags'] = df_members_temp['members_tags'].map(dict_rock_artist_members).str[0]
-df_members_temp = df_members_temp.dropna(subset=df_members_temp.columns.difference(['index_1']),how='all')
-df_members_temp = df_members_temp.fillna('')
-df_members_temp[df_members_temp.columns.difference(['index_1'])].astype(str)
-df_members_temp = df_members_temp.groupby('index_1').agg(pd.Series.tolist)
-df_rock_artist_tags = df_rock_news_subset.iloc[:,0].to_frame().join(df_members_temp)
-utils_tpp.return_empty_list_from_nan(df_rock_artist_tags,['rock_artist_tags_prep','rock_artist_tags_add','tags_rock_artist_from_member_tags','members_tags'])
-utils_tpp.replace_list_empty_string(df_rock_artist_tags,['rock_artist_tags_prep','rock_artist_tags_add','tags_rock_artist_from_member_tags','members_tags'])
-df_rock_artist_tags['rock_artist_tags'] = df_rock_artist_tags['rock_artist_tags_prep'] + df_rock_artist_tags['rock_artist_tags_add'] + df_rock_artist_tags['tags_rock_artist_from_member_tags']
-utils_tpp.remove_dups_sort_lists(df_rock_artist_tags,['rock_artist_tags','members_tags'])
+tags_rock_artist_from_member_tags = members_tags.map({k: v[1] for k, v in dict_rock_artist_members.items()})
+rock_artist_tags = rock_artist_tags_prep.map(dict_rock_artist).concat(rock_artist_tags_add.map(dict_rock_artist), tags_rock_artist_from_member_tags)
+members_tags = members_tags.map({k: v[0] for k, v in dict_rock_artist_members.items()})
+rock_artist_tags, members_tags = rock_artist_tags.unique_sorted(), members_tags.unique_sorted()
 
 #==============================================================================
 # 3. SAVE DATA AS CSV FILE
 #==============================================================================
 
 ## 3.1. IDENTIFIED ROCK ARTISTS AND ROCK ARTIST MEMBERS PER TEXT
-df_rock_artist_tags = df_rock_artist_tags.iloc[:,np.r_[0,-1,-3]]
+df_rock_artist_tags = df_rock_news_subset.iloc[:,0].to_frame().assign(rock_artist_tags=rock_artist_tags.to_lists(), members_tags=members_tags.to_lists())
 df_rock_artist_tags.to_csv(f'{path_output_csv}/rock_news_nlp_rock_artist_tags.csv', header=True, index=False, encoding='utf-8',sep=';')
+if sparse_output:
+    rock_artist_tags.save_npz(f'{path_output_sparse}/rock_news_nlp_rock_artist_tags_rock_artist_tags.npz', df_rock_artist_tags['full_pk'])
+    members_tags.save_npz(f'{path_output_sparse}/rock_news_nlp_rock_artist_tags_members_tags.npz', df_rock_artist_tags['full_pk'])
+    ### NUMBER OF ARTICLES PER ROCK ARTIST PER MONTH
+    df_rock_artist_month = rock_artist_tags.counts_by(pd.to_datetime(df_rock_news['date'].iloc[0:20000], errors='coerce').dt.to_period('M'))
+    df_rock_artist_month = df_rock_artist_month.rename(columns={'group': 'month', 'tag': 'rock_artist', 'n_docs': 'n_articles'})
+    df_rock_artist_month.to_csv(f'{path_output_csv}/rock_news_nlp_rock_artist_tags_month.csv', header=True, index=False, encoding='utf-8',sep=';')
 
 ## 3.2. DISTINCT IDENTIFIED ROCK ARTISTS AND ROCK ARTIST MEMBERS
 identified_rock_artists_temp = df_rock_artist_tags['rock_artist_tags'] + df_rock_artist_tags['members_tags']
@@ -0,0 +1,245 @@
+"""
+Rock News NLP: HTML parsing for the web scrapers
+Created on Mon Oct 19 09:14:52 2026
+@author: IvoBarros
+
+The html fixtures of the benchmark (data/web_scrapers/html_fixtures) are 
+synthetic pages rebuilt from the scraped data (same meta tags, content div
+and infobox table as the live pages, padded with generated css, scripts and 
+navigation links), so the timings measured on them are not real-page 
+measurements.
+"""
+
+import os
+import os.path
+import sqlite3
+import tracemalloc
+import zlib
+import pandas as pd
+from glob import glob
+from time import perf_counter
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+path_parent_dir = os.path.dirname(os.getcwd())
+path_data_web_scrapers = os.path.join(path_parent_dir, 'data', 'web_scrapers')
+
+html_parser = 'lxml' if lxml is not None else 'html.parser'
+infobox_strainer = SoupStrainer('table', attrs={'class':'infobox vcard plainlist'})
+xpath_news_article = {'website': "//meta[@property='og:site_name']/@content",
+                      'title': "//meta[@property='og:title']/@content",
+                      'description': "//meta[@property='og:description']/@content",
+                      'date': "//meta[@name='sailthru.date']/@content"}
+xpath_news_article_body = "//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]"
+tags_without_text = {'script', 'style', 'template'}
+
+def element_text(element):
+    """
+    To get the text of an lxml element the way BeautifulSoup .text does
+    (i.e. without the script, style, template and comment strings)
+
+    Args:
+        element : lxml.html.HtmlElement
+
+    Returns:
+        str
+    """
+    parts = []
+    def walk(node):
+        if isinstance(node.tag, str) and node.tag not in tags_without_text:
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+        if node is not element and node.tail:
+            parts.append(node.tail)
+    walk(element)
+    return ''.join(parts)
+
+def news_article_attributes_soup(content):
+    """
+    To extract the attributes of a news article parsing the full page with
+    BeautifulSoup and html.parser
+
+    Args:
+        content : bytes
+
+    Returns:
+        dict (None if an attribute is missing)
+    """
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+        return {'website': soup.find('meta', attrs={'property':'og:site_name'})['content'],
+                'title': soup.find('meta', attrs={'property':'og:title'})['content'],
+                'description': soup.find('meta', attrs={'property':'og:description'})['content'],
+                'body': soup.find('div',attrs={'class':'content'}).text.strip(),
+                'date': soup.find('meta', attrs={'name':'sailthru.date'})['content']}
+    except:
+        return None
+
+def news_article_attributes(content):
+    """
+    To extract the attributes of a news article with lxml and xpath,
+    without building a BeautifulSoup tree (same output as
+    news_article_attributes_soup)
+
+    Args:
+        content : bytes
+
+    Returns:
+        dict (None if an attribute is missing)
+    """
+    if lxml is None:
+        return news_article_attributes_soup(content)
+    try:
+        markup = UnicodeDammit(content, is_html=True).unicode_markup if isinstance(content, bytes) else content
+        document = lxml.html.fromstring(markup)
+    except:
+        return news_article_attributes_soup(content)
+    article = {}
+    for k, v in xpath_news_article.items():
+        values = document.xpath(v)
+        if not values:
+            return None
+        article[k] = str(values[0])
+    body = document.xpath(xpath_news_article_body)
+    if not body:
+        return None
+    article['body'] = element_text(body[0]).strip()
+    return {k: article[k] for k in ['website', 'title', 'description', 'body', 'date']}
+
+def infobox_table(content, fast=True):
+    """
+    To get the infobox table of a Wikipedia rock artist page, parsing only
+    that subtree (SoupStrainer) with the fastest parser available if fast
+
+    Args:
+        content : bytes
+        fast : bool
+
+    Returns:
+        bs4.element.Tag (None if the page has no infobox)
+    """
+    if fast:
+        soup = BeautifulSoup(content, html_parser, parse_only=infobox_strainer)
+    else:
+        soup = BeautifulSoup(content, 'html.parser')
+    return soup.find('table', attrs={'class':'infobox vcard plainlist'})
+
+def load_html_fixtures(path):
+    """
+    To load the saved html pages (*.html) of a folder
+
+    Args:
+        path : str
+
+    Returns:
+        dict (file name as key, bytes as value)
+    """
+    dict_pages = {}
+    for i in sorted(glob(os.path.join(path, '*.html'))):
+        with open(i, 'rb') as f:
+            dict_pages[os.path.basename(i)] = f.read()
+    return dict_pages
+
+def load_http_cache_pages(file_path, url_pattern):
+    """
+    To load the html pages stored by the http cache of the web scrapers
+
+    Args:
+        file_path : str (sqlite file of cached_transport)
+        url_pattern : str (sql LIKE pattern)
+
+    Returns:
+        dict (url as key, bytes as value)
+    """
+    conn = sqlite3.connect(file_path)
+    try:
+        rows = conn.execute("SELECT url, body FROM responses WHERE url LIKE ? ORDER BY url", (url_pattern,)).fetchall()
+    finally:
+        conn.close()
+    return {url: zlib.decompress(body) for url, body in rows}
+
+def benchmark_parser(dict_pages, parse_function, n_repeat=3):
+    """
+    To measure the parse time and the peak memory per page of a parse function
+
+    Args:
+        dict_pages : dict
+        parse_function : function
+        n_repeat : int
+
+    Returns:
+        DataFrame, dict (page as key, output as value)
+    """
+    benchmark_data = {'page': [], 'size_kb': [], 'time_ms': [], 'peak_memory_kb': []}
+    dict_output = {}
+    for page, content in dict_pages.items():
+        list_time = []
+        for _ in range(n_repeat):
+            t_start = perf_counter()
+            dict_output[page] = parse_function(content)
+            list_time.append((perf_counter() - t_start) * 1000)
+        tracemalloc.start()
+        parse_function(content)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        benchmark_data['page'].append(page)
+        benchmark_data['size_kb'].append(len(content) / 1024)
+        benchmark_data['time_ms'].append(min(list_time))
+        benchmark_data['peak_memory_kb'].append(peak_memory / 1024)
+    return pd.DataFrame(benchmark_data), dict_output
+
+def benchmark(dict_pages, dict_parse_functions, n_repeat=3):
+    """
+    To compare the parse time and the peak memory per page of parse functions
+    producing the same output, the first one being the baseline
+
+    Args:
+        dict_pages : dict
+        dict_parse_functions : dict (name as key, function as value)
+        n_repeat : int
+
+    Returns:
+        DataFrame
+    """
+    list_stats = []
+    baseline_output = None
+    for name, parse_function in dict_parse_functions.items():
+        df_benchmark, dict_output = benchmark_parser(dict_pages, parse_function, n_repeat)
+        if baseline_output is None:
+            baseline_output = dict_output
+        list_stats.append({'parser': name, 'pages': len(df_benchmark),
+                           'mean_time_ms': df_benchmark['time_ms'].mean(),
+                           'mean_peak_memory_kb': df_benchmark['peak_memory_kb'].mean(),
+                           'same_output_%': 100 * sum(dict_output[i] == baseline_output[i] for i in dict_output) / max(len(dict_output), 1)})
+    df_stats = pd.DataFrame(list_stats)
+    df_stats['speedup'] = df_stats['mean_time_ms'].iloc[0] / df_stats['mean_time_ms'] if len(df_stats) else None
+    return df_stats.round(2)
+
+def infobox_text(fast):
+    return lambda content: getattr(infobox_table(content, fast), 'text', None)
+
+def main():
+    global path_data_web_scrapers
+
+    path_fixtures = os.path.join(path_data_web_scrapers, 'html_fixtures')
+    path_http_cache = os.path.join(path_data_web_scrapers, 'http_cache.sqlite')
+    if os.path.isdir(path_fixtures):
+        dict_news_pages = load_html_fixtures(os.path.join(path_fixtures, 'loudwire'))
+        dict_wiki_pages = load_html_fixtures(os.path.join(path_fixtures, 'wikipedia'))
+    elif os.path.exists(path_http_cache):
+        dict_news_pages = load_http_cache_pages(path_http_cache, 'https://loudwire.com/%')
+        dict_wiki_pages = load_http_cache_pages(path_http_cache, 'https://en.wikipedia.org/wiki/%')
+        dict_wiki_pages = {k: v for k, v in dict_wiki_pages.items() if '/wiki/List_of' not in k and '/wiki/Category' not in k}
+    else:
+        print(f'No html pages to benchmark: neither {path_fixtures} nor {path_http_cache} exists')
+        return
+    print('# News articles\n', benchmark(dict_news_pages, {'html.parser': news_article_attributes_soup, 'lxml xpath': news_article_attributes}).to_string())
+    print('# Wikipedia infoboxes\n', benchmark(dict_wiki_pages, {'html.parser': infobox_text(False), f'{html_parser} + SoupStrainer': infobox_text(True)}).to_string())
+
+if __name__ == "__main__":
+    main()
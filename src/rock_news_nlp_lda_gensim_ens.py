@@ -9,20 +9,25 @@ import numpy as np
 import re
 import os
 import os.path
+import tempfile
+from itertools import islice
 from gensim import models
 import gensim.corpora as corpora
 from gensim.corpora import Dictionary
 from gensim.models import CoherenceModel
 from gensim.models import EnsembleLda
 from gensim.models import LdaModel
-from gensim.test.utils import datapath
+from gensim.models import Phrases
+from gensim.models.phrases import Phraser
 from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
 import rock_news_nlp_utilities as utils_tpp
+from rock_news_nlp_class_artifact_store import artifact_store
 
 path_parent_dir = os.path.dirname(os.getcwd())
 path_data_data_subsets = f'{path_parent_dir}\\data\\data_subsets'
 path_output = f'{path_parent_dir}\\output'
 path_output_pickled_obj = f'{path_output}\\pickled_objects'
+path_output_artifacts = f'{path_output}\\artifacts'
 
 num_topics = 20
 num_models = 16
@@ -33,6 +38,8 @@ topic_model_class = LdaModel
 no_below = 15
 no_above = 0.5
 keep_n = 100000
+chunksize = 10000
+serialize_corpus = False
 
 def dictionary(text_corpus, *args, **kwargs):
     """
@@ -62,8 +69,7 @@ def save_dictionary(path, dictionary, dictionary_name):
     Returns:
         Write the representation of the gensim dictionary to a file
     """
-    temp_file = datapath(f'{path}/{dictionary_name}')
-    dictionary.save(temp_file)
+    dictionary.save(os.path.join(path, dictionary_name))
 
 def load_dictionary(dictionary_name):
     """
@@ -78,6 +84,191 @@ def load_dictionary(dictionary_name):
     dictionary = Dictionary.load(dictionary_name)
     return dictionary
 
+def save_bigram_model(path, bigram_model, bigram_model_name):
+    """
+    To save a gensim bigram model (trainable or frozen) to file
+    
+    Args:
+        path : str
+        bigram_model : models.phrases.Phrases or models.phrases.Phraser
+        bigram_model_name : str
+        
+    Returns:
+        Write the representation of the bigram model to a file
+    """
+    bigram_model.save(f'{path}/{bigram_model_name}')
+
+def load_bigram_model(path, bigram_model_name, frozen=True):
+    """
+    To load a gensim bigram model from a file
+    
+    Args:
+        path : str
+        bigram_model_name : str
+        frozen : bool
+        
+    Returns:
+        models.phrases.Phraser or models.phrases.Phrases
+    """
+    if frozen:
+        return Phraser.load(f'{path}/{bigram_model_name}')
+    return Phrases.load(f'{path}/{bigram_model_name}')
+
+def update_bigram_model(path, text_corpus):
+    """
+    To update the trained bigram model with newly scraped texts (add_vocab) 
+    instead of training it again on the whole corpus, and save both the 
+    trainable and the frozen bigram models
+    
+    Args:
+        path : str
+        text_corpus : list
+        
+    Returns:
+        models.phrases.Phraser
+    """
+    bigram = load_bigram_model(path, 'gensim_ens_train_bigram_phrases', frozen=False)
+    bigram = tpp.update_bigrams(bigram, tpp.text_preprocessing_prep(text_corpus))
+    bigram_model = tpp.freeze_bigrams(bigram)
+    save_bigram_model(path, bigram, 'gensim_ens_train_bigram_phrases')
+    save_bigram_model(path, bigram_model, 'gensim_ens_train_bigram_phraser')
+    return bigram_model
+
+class rock_news_bow_corpus:
+    """
+    Streaming gensim corpus which reads the rock news texts from a CSV file in
+    chunks, preprocesses them on the fly and yields bag of words vectors, so 
+    that the corpus never needs to fit in memory
+    
+    fit() runs every text preprocessing stage only once: the preliminary 
+    tokens are written to a tokens file while the bigram model is trained, 
+    and the final tokens are built from that file, written to a second tokens
+    file and added to the dictionary in the same pass. The following 
+    iterations only read the final tokens file (stored in cache_dir, or in a 
+    temporary directory removed with the corpus); serialize() writes the 
+    vectors once to a Matrix Market file.
+    """
+    
+    def __init__(self, file_path, file_name, col_name, dictionary=None, bigram_model=None, chunksize=10000, sep=';', cache_dir=None):
+        self.file_path = file_path
+        self.file_name = file_name
+        self.col_name = col_name
+        self.dictionary = dictionary
+        self.bigram_model = bigram_model
+        self.chunksize = chunksize
+        self.sep = sep
+        self.temp_dir = tempfile.TemporaryDirectory(prefix='rock_news_bow_corpus_') if cache_dir is None else None
+        self.cache_dir = cache_dir if cache_dir is not None else self.temp_dir.name
+        self.tokens_file = None
+
+    def texts(self):
+        """
+        To read the raw texts chunk by chunk
+        
+        Yields:
+            str
+        """
+        for chunk in pd.read_csv(f'{self.file_path}/{self.file_name}', sep=self.sep, usecols=[self.col_name], chunksize=self.chunksize):
+            yield from chunk[self.col_name]
+
+    def tokens_prep(self):
+        """
+        To preprocess the raw texts up to the bigram model (see 
+        tpp.pipeline_prep)
+        
+        Yields:
+            list of substrings
+        """
+        return tpp.run_pipeline('prep', self.texts(), chunk_size=self.chunksize)
+
+    def tokens(self):
+        """
+        To preprocess the raw texts with all the Gensim text preprocessing 
+        techniques (read from the tokens file once fit() has run)
+        
+        Yields:
+            list of substrings
+        """
+        if self.tokens_file is not None:
+            return self.read_tokens(self.tokens_file)
+        return tpp.run_pipeline('to_gensim', self.tokens_prep(), self.bigram_model, chunk_size=self.chunksize)
+
+    @staticmethod
+    def write_tokens(tokens, file_path):
+        """
+        To write the tokens of every text to a file (one text per line) while
+        passing them on
+        
+        Args:
+            tokens : iterable of lists
+            file_path : str
+            
+        Yields:
+            list of substrings
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for i in tokens:
+                f.write(' '.join(i) + '\n')
+                yield i
+
+    @staticmethod
+    def read_tokens(file_path):
+        """
+        To read the tokens written by write_tokens
+        
+        Args:
+            file_path : str
+            
+        Yields:
+            list of substrings
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for i in f:
+                yield i.split()
+
+    def fit(self, min_count=20, threshold=100, **kwargs):
+        """
+        To train the bigram model and build the dictionary, preprocessing the
+        texts only once
+        
+        Args:
+            min_count : int
+            threshold : float
+            **kwargs : arguments of filter_extremes (no_below, no_above, keep_n)
+            
+        Returns:
+            models.phrases.Phrases, models.phrases.Phraser, corpora.dictionary.Dictionary
+        """
+        tokens_prep_file = os.path.join(self.cache_dir, f'{self.file_name}.tokens_prep.txt')
+        tokens_file = os.path.join(self.cache_dir, f'{self.file_name}.tokens.txt')
+        bigram = tpp.fit_bigrams(self.write_tokens(self.tokens_prep(), tokens_prep_file), min_count=min_count, threshold=threshold)
+        self.bigram_model = tpp.freeze_bigrams(bigram)
+        tokens = tpp.run_pipeline('to_gensim', self.read_tokens(tokens_prep_file), self.bigram_model, chunk_size=self.chunksize)
+        self.dictionary = dictionary(self.write_tokens(tokens, tokens_file), **kwargs)
+        os.remove(tokens_prep_file)
+        self.tokens_file = tokens_file
+        return bigram, self.bigram_model, self.dictionary
+
+    def __iter__(self):
+        for tokens in self.tokens():
+            yield self.dictionary.doc2bow(tokens)
+
+    def serialize(self, path, corpus_name):
+        """
+        To write the bag of words vectors to a Matrix Market file and return
+        the corpus streamed from that file
+        
+        Args:
+            path : str
+            corpus_name : str
+            
+        Returns:
+            corpora.mmcorpus.MmCorpus
+        """
+        os.makedirs(path, exist_ok=True)
+        corpora.MmCorpus.serialize(f'{path}/{corpus_name}', self)
+        return corpora.MmCorpus(f'{path}/{corpus_name}')
+
 def corpus_bow(text_corpus,dictionary):
     """
     To create a gensim bag of words corpus
@@ -87,12 +278,22 @@ def corpus_bow(text_corpus,dictionary):
         dictionary : corpora.dictionary.Dictionary
         
     Returns:
-        list, interfaces.TransformedCorpus
+        list
+    """
+    return [dictionary.doc2bow(i) for i in text_corpus]
+
+def corpus_tfidf(corpus):
+    """
+    To transform a gensim bag of words corpus with TF-IDF
+    
+    Args:
+        corpus : list
+        
+    Returns:
+        interfaces.TransformedCorpus
     """
-    corpus = [dictionary.doc2bow(i) for i in text_corpus]
     tfidf = models.TfidfModel(corpus)
-    corpus_tfidf = tfidf[corpus]
-    return corpus, corpus_tfidf
+    return tfidf[corpus]
 
 def ens_lda_model(corpus, dictionary):
     """
@@ -138,6 +339,29 @@ def topics_ens_lda(ens_lda_model):
     dict_ens_lda_top_5_words = {i: re.sub('[^A-Za-z ]+', ' ', x).split() for i, x in ens_lda_model.print_topics(num_words=5)}
     return dict_ens_lda_topics_p, dict_ens_lda_top_5_words
     
+def document_topic_matrix(lda_model, corpus, chunksize=2000):
+    """
+    To infer the dense document-topic matrix of a bag of words corpus, a 
+    chunk of documents at a time (the rows are the normalised variational 
+    parameters gamma, i.e. get_document_topics with minimum_probability=0)
+    
+    Args:
+        lda_model : models.ensemblelda.EnsembleLda or models.LdaModel
+        corpus : iterable
+        chunksize : int
+        
+    Returns:
+    	Array of float64, shape (number of documents, number of topics)
+    """
+    iterator = iter(corpus)
+    list_gamma = []
+    for chunk in iter(lambda: list(islice(iterator, chunksize)), []):
+        gamma, _ = lda_model.inference(chunk)
+        list_gamma.append(gamma / gamma.sum(axis=1, keepdims=True))
+    if not list_gamma:
+        return np.empty((0, lda_model.get_topics().shape[0]))
+    return np.vstack(list_gamma)
+
 def df_output(ens_lda_model, dictionary, text_corpus, dict_ens_lda_topics_p, dict_ens_lda_top_5_words):
     """
     To get the most relevant topics per text of the corpus
@@ -145,20 +369,26 @@ def df_output(ens_lda_model, dictionary, text_corpus, dict_ens_lda_topics_p, dic
     Args:
         ens_lda_model : models.ensemblelda.EnsembleLda
         dictionary : corpora.dictionary.Dictionary
-        text_corpus : list
+        text_corpus : iterable (bag of words)
         dict_ens_lda_topics_p : dict
         dict_ens_lda_top_5_words : dict
         
     Returns:
     	DataFrame
     """
-    list_ens_lda_prob = [[j[1] for j in i] for i in ens_lda_model[text_corpus]]
-    df_ens_lda_output = pd.DataFrame(list_ens_lda_prob)
-    df_ens_lda_output['main_topic'] = np.argmax(df_ens_lda_output.values, axis=1)
-    df_ens_lda_output['main_topic_%'] = df_ens_lda_output.iloc[:,0:len(df_ens_lda_output.columns)-1].max(axis=1)
-    df_ens_lda_output['main_topic_top_5_words'] = df_ens_lda_output['main_topic'].map(dict_ens_lda_top_5_words)
-    df_ens_lda_output['main_topic_words_p'] = df_ens_lda_output['main_topic'].map(dict_ens_lda_topics_p)
-    df_ens_lda_output = df_ens_lda_output.rename(columns= {i: "topic_" + str(i) for i in df_ens_lda_output.columns if str(i).isdigit()==True})
+    ens_lda_prob = document_topic_matrix(ens_lda_model, text_corpus)
+    main_topic = np.argmax(ens_lda_prob, axis=1)
+    array_top_5_words = np.empty(ens_lda_prob.shape[1], dtype=object)
+    array_topics_p = np.empty(ens_lda_prob.shape[1], dtype=object)
+    for i in range(ens_lda_prob.shape[1]):
+        array_top_5_words[i] = dict_ens_lda_top_5_words.get(i)
+        array_topics_p[i] = dict_ens_lda_topics_p.get(i)
+    
+    df_ens_lda_output = pd.DataFrame(ens_lda_prob, columns=[f'topic_{i}' for i in range(ens_lda_prob.shape[1])])
+    df_ens_lda_output['main_topic'] = main_topic
+    df_ens_lda_output['main_topic_%'] = ens_lda_prob[np.arange(len(main_topic)), main_topic]
+    df_ens_lda_output['main_topic_top_5_words'] = array_top_5_words[main_topic]
+    df_ens_lda_output['main_topic_words_p'] = array_topics_p[main_topic]
     return df_ens_lda_output.round(2)
 
 def save_gens_lda_model(path, lda_object, lda_object_file_name):
@@ -172,22 +402,21 @@ def save_gens_lda_model(path, lda_object, lda_object_file_name):
     Returns:
     	Write the representation of the object to a file
     """
-    temp_file = datapath(f'{path}/{lda_object_file_name}')
-    lda_object.save(temp_file)
+    lda_object.save(os.path.join(path, lda_object_file_name))
 
-def load_gens_lda_model(path, lda_object_file_name, lda_object_name):
+def load_gens_lda_model(path, lda_object_file_name, lda_object_name, mmap=None):
     """
     To load the gensim ensemble lda object
     
     Args:
         lda_object : obj
         lda_object_file_name : str
+        mmap : str, default None ('r' to memory-map the large arrays)
     
     Returns:
     	models.ensemblelda.EnsembleLda
     """ 
-    temp_file = datapath(f'{path}/{lda_object_file_name}')
-    lda_object_name = EnsembleLda.load(temp_file)
+    lda_object_name = EnsembleLda.load(os.path.join(path, lda_object_file_name), mmap=mmap)
     return lda_object_name
 
 def metric_perplexity(lda_model, text_corpus):
@@ -210,6 +439,7 @@ def metric_coherence(*args, **kwargs):
     Args:
         model : models.ensemblelda.EnsembleLda
         texts : list
+        corpus : iterable (bag of words, instead of texts)
         dictionary : corpora.dictionary.Dictionary
         
     Returns:
@@ -228,21 +458,27 @@ def main():
     global no_below
     global no_above
     global keep_n
+    global chunksize
+    global serialize_corpus
     global path_data_web_scrapers 
     global path_output
 
-    text_corpus = utils_tpp.load_text_corpus(path_data_data_subsets, 'rock_news_train_set.csv', ';', None, 'title')
-    text_corpus_clean = tpp.text_preprocessing_to_gensim(text_corpus)    
-    dictionary_lda = dictionary(text_corpus_clean, no_below=no_below, no_above=no_above, keep_n=keep_n)
+    text_corpus = rock_news_bow_corpus(path_data_data_subsets, 'rock_news_train_set.csv', 'title', chunksize=chunksize)
+    bigram, bigram_model, dictionary_lda = text_corpus.fit(no_below=no_below, no_above=no_above, keep_n=keep_n)
     # save_dictionary(path_output_pickled_obj, dictionary_lda, 'gensim_ens_train_dict_lda')
-    corpus, corpus_tfidf = corpus_bow(text_corpus_clean,dictionary_lda)
+    # save_bigram_model(path_output_pickled_obj, bigram, 'gensim_ens_train_bigram_phrases')
+    # save_bigram_model(path_output_pickled_obj, bigram_model, 'gensim_ens_train_bigram_phraser')
+    corpus = text_corpus.serialize(path_output_pickled_obj, 'gensim_ens_train_corpus.mm') if serialize_corpus else text_corpus
     lda_model = ens_lda_model(corpus, dictionary_lda)
     # save_gens_lda_model(path_output_pickled_obj, lda_model, 'gensim_ens_train_lda_model')
     dict_ens_lda_topics_p, dict_ens_lda_top_5_words = topics_ens_lda(lda_model)
     # utils_tpp.save_py_object(dict_ens_lda_topics_p, path_output_pickled_obj, 'gensim_ens_train_topics_lda.pickle')
     # utils_tpp.save_py_object(dict_ens_lda_top_5_words, path_output_pickled_obj, 'gensim_ens_train_topics_top_5_words_lda.pickle')
+    # artifact_store(path_output_artifacts, 'gensim_ens_lda').save({'dictionary': dictionary_lda, 'bigram_model': bigram_model, 'lda_model': lda_model,
+    #                                                               'dict_ens_lda_topics_p': dict_ens_lda_topics_p, 'dict_ens_lda_top_5_words': dict_ens_lda_top_5_words})
+    # tpp.stemmer.save(path_output_pickled_obj, 'text_preprocessing_stem_cache.pickle')
     model_perplexity = metric_perplexity(lda_model, corpus)
-    coherence_score = metric_coherence(model=lda_model, texts=text_corpus_clean, dictionary=dictionary_lda, coherence='u_mass')
+    coherence_score = metric_coherence(model=lda_model, corpus=corpus, dictionary=dictionary_lda, coherence='u_mass')
     utils_tpp.print_lda_model_topics_stats(dict_ens_lda_top_5_words,model_perplexity,coherence_score )
 
 if __name__ == "__main__":
@@ -25,15 +25,17 @@ path_output_csv = f'{path_output}\\csv'
 
 text_corpus = utils_tpp.load_text_corpus(path_data_data_subsets, 'rock_news_test_set.csv', ';', None, 'title')
 dictionary_train = lda_gens.load_dictionary(f'{path_output_pickled_obj}/gensim_ens_train_dict_lda')
+bigram_model_train = lda_gens.load_bigram_model(path_output_pickled_obj, 'gensim_ens_train_bigram_phraser')
 ens_lda_train = lda_gens.load_gens_lda_model(path_output_pickled_obj, 'gensim_ens_train_lda_model', 'ens_lda_train')
 dict_ens_lda_topics_p = utils_tpp.load_py_object('dict_ens_lda_topics_p', path_output_pickled_obj, 'gensim_ens_train_topics_lda.pickle')
 dict_ens_lda_top_5_words = utils_tpp.load_py_object('dict_ens_lda_top_5_words', path_output_pickled_obj, 'gensim_ens_train_topics_top_5_words_lda.pickle')
+tpp.stemmer.load(path_output_pickled_obj, 'text_preprocessing_stem_cache.pickle')
 
 #==============================================================================
 # 2. EVALUATE THE MODEL
 #==============================================================================
-text_corpus_clean = tpp.text_preprocessing_to_gensim(text_corpus)
-corpus, corpus_tfidf = lda_gens.corpus_bow(text_corpus_clean, dictionary_train)
+text_corpus_clean = tpp.text_preprocessing_to_gensim(text_corpus, bigram_model_train)
+corpus = lda_gens.corpus_bow(text_corpus_clean, dictionary_train)
 lda_gensim_test_subset_output = lda_gens.df_output(ens_lda_train, dictionary_train, corpus, dict_ens_lda_topics_p, dict_ens_lda_top_5_words)
 lda_gensim_test_subset_output.insert(0,'title',text_corpus)
 lda_gensim_test_subset_output.to_csv(f'{path_output_csv}/rock_news_nlp_lda_gensim_test_subset_output.csv', header=True, index=False, encoding='utf-8',sep=';')
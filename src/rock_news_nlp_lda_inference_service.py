@@ -0,0 +1,351 @@
+"""
+Rock News NLP: Topic Modelling LDA Inference Service
+Created on Sun Oct 18 15:42:08 2026
+@author: IvoBarros
+"""
+
+import os
+import os.path
+import json
+import queue
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter, time
+from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
+import rock_news_nlp_utilities as utils_tpp
+from rock_news_nlp_class_artifact_store import artifact_store
+
+path_parent_dir = os.path.dirname(os.getcwd())
+path_output = f'{path_parent_dir}\\output'
+path_output_pickled_obj = f'{path_output}\\pickled_objects'
+path_output_artifacts = f'{path_output}\\artifacts'
+
+model_backend = 'sklearn'
+host = '127.0.0.1'
+port = 8765
+max_batch_size = 512
+max_wait_ms = 10
+max_texts_per_request = 10000
+
+class sklearn_topic_model:
+    """
+    Sklearn lda model, fitted vectorizer and topics loaded once from the
+    artifact store (memory-mapped) or else the pickled objects of 
+    rock_news_nlp_lda_sklearn
+    """
+
+    name = 'sklearn'
+
+    def __init__(self, path, path_artifacts=None):
+        import rock_news_nlp_lda_sklearn as lda_sklearn
+        tpp.stemmer.load(path, 'text_preprocessing_stem_cache.pickle')
+        store = artifact_store(path_artifacts, 'sklearn_lda') if path_artifacts else None
+        if store is not None and store.exists():
+            dict_artifacts = store.load(mmap_mode='r')
+            self.lda_model, self.count_vec = dict_artifacts['lda_model'], dict_artifacts['count_vec']
+            self.dict_topics = dict_artifacts.get('dict_topics') or lda_sklearn.topics(self.lda_model, self.count_vec)
+            return
+        self.lda_model = utils_tpp.load_py_object('lda_model', path, 'sklearn_train_lda_model.pickle')
+        self.count_vec = utils_tpp.load_py_object('count_vec', path, 'sklearn_train_vectorizer.pickle')
+        if os.path.exists(f'{path}/sklearn_train_topics.pickle'):
+            self.dict_topics = utils_tpp.load_py_object('dict_topics', path, 'sklearn_train_topics.pickle')
+        else:
+            self.dict_topics = lda_sklearn.topics(self.lda_model, self.count_vec)
+
+    def transform(self, text_corpus):
+        """
+        To infer the document-topic matrix of a list of texts
+
+        Args:
+            text_corpus : list
+
+        Returns:
+            Array of float64, shape (number of texts, number of topics)
+        """
+        text_corpus_clean = tpp.text_preprocessing_to_sklearn(text_corpus, n_workers=1)
+        return self.lda_model.transform(self.count_vec.transform(text_corpus_clean))
+
+class gensim_topic_model:
+    """
+    Gensim ensemble lda model, dictionary, bigram phraser and topics loaded
+    once from the artifact store (memory-mapped) or else the pickled objects
+    of rock_news_nlp_lda_gensim_ens
+    """
+
+    name = 'gensim'
+
+    def __init__(self, path, path_artifacts=None):
+        import rock_news_nlp_lda_gensim_ens as lda_gens
+        self.lda_gens = lda_gens
+        tpp.stemmer.load(path, 'text_preprocessing_stem_cache.pickle')
+        store = artifact_store(path_artifacts, 'gensim_ens_lda') if path_artifacts else None
+        if store is not None and store.exists():
+            dict_artifacts = store.load(mmap_mode='r', keys=['dictionary', 'bigram_model', 'lda_model', 'dict_ens_lda_top_5_words'])
+            self.dictionary, self.bigram_model = dict_artifacts['dictionary'], dict_artifacts['bigram_model']
+            self.lda_model, self.dict_topics = dict_artifacts['lda_model'], dict_artifacts['dict_ens_lda_top_5_words']
+            return
+        self.dictionary = lda_gens.load_dictionary(f'{path}/gensim_ens_train_dict_lda')
+        self.bigram_model = lda_gens.load_bigram_model(path, 'gensim_ens_train_bigram_phraser')
+        self.lda_model = lda_gens.load_gens_lda_model(path, 'gensim_ens_train_lda_model', 'ens_lda_train')
+        self.dict_topics = utils_tpp.load_py_object('dict_ens_lda_top_5_words', path, 'gensim_ens_train_topics_top_5_words_lda.pickle')
+
+    def transform(self, text_corpus):
+        """
+        To infer the document-topic matrix of a list of texts
+
+        Args:
+            text_corpus : list
+
+        Returns:
+            Array of float64, shape (number of texts, number of topics)
+        """
+        text_corpus_clean = tpp.text_preprocessing_to_gensim(text_corpus, self.bigram_model, n_workers=1)
+        corpus = self.lda_gens.corpus_bow(text_corpus_clean, self.dictionary)
+        return self.lda_gens.document_topic_matrix(self.lda_model, corpus)
+
+def load_topic_model(backend, path, path_artifacts=None):
+    """
+    To load the topic model of a given backend
+
+    Args:
+        backend : str ('sklearn' or 'gensim')
+        path : str (pickled objects)
+        path_artifacts : str, default None (artifact store root, preferred if not empty)
+
+    Returns:
+        sklearn_topic_model or gensim_topic_model
+    """
+    dict_backends = {'sklearn': sklearn_topic_model, 'gensim': gensim_topic_model}
+    if backend not in dict_backends:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {list(dict_backends)}")
+    return dict_backends[backend](path, path_artifacts)
+
+class latency_metrics:
+    """
+    Thread-safe counters and a rolling window of latencies (ms) of the
+    requests and the model batches
+    """
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.t_start = time()
+        self.nr_requests = 0
+        self.nr_texts = 0
+        self.nr_batches = 0
+        self.nr_errors = 0
+        self.request_latency = deque(maxlen=window)
+        self.batch_latency = deque(maxlen=window)
+        self.batch_size = deque(maxlen=window)
+
+    def add_request(self, nr_texts, latency_ms, error=False):
+        with self.lock:
+            self.nr_requests += 1
+            self.nr_texts += nr_texts
+            self.nr_errors += error
+            self.request_latency.append(latency_ms)
+
+    def add_batch(self, batch_size, latency_ms):
+        with self.lock:
+            self.nr_batches += 1
+            self.batch_size.append(batch_size)
+            self.batch_latency.append(latency_ms)
+
+    @staticmethod
+    def percentiles(values):
+        if not values:
+            return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'p50': round(p50, 2), 'p95': round(p95, 2), 'p99': round(p99, 2), 'max': round(max(values), 2)}
+
+    def summary(self):
+        """
+        To get the service stats
+
+        Returns:
+            dict
+        """
+        with self.lock:
+            request_latency = list(self.request_latency)
+            batch_latency = list(self.batch_latency)
+            batch_size = list(self.batch_size)
+            dict_summary = {'uptime_s': round(time() - self.t_start, 1), 'requests': self.nr_requests,
+                            'texts': self.nr_texts, 'batches': self.nr_batches, 'errors': self.nr_errors}
+        dict_summary['mean_batch_size'] = round(float(np.mean(batch_size)), 2) if batch_size else None
+        dict_summary['request_latency_ms'] = self.percentiles(request_latency)
+        dict_summary['batch_latency_ms'] = self.percentiles(batch_latency)
+        return dict_summary
+
+class micro_batcher:
+    """
+    Single worker thread which merges the texts of concurrent requests into
+    one batch, so the model runs a vectorized transform per batch instead of
+    per request
+
+    A batch is closed when it reaches max_batch_size texts or when the
+    oldest request has waited max_wait_ms.
+    """
+
+    def __init__(self, topic_model, max_batch_size=512, max_wait_ms=10, metrics=None):
+        self.topic_model = topic_model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics if metrics is not None else latency_metrics()
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, text_corpus):
+        """
+        To queue a list of texts for inference
+
+        Args:
+            text_corpus : list
+
+        Returns:
+            Future (Array of float64)
+        """
+        future = Future()
+        self.requests.put((list(text_corpus), future))
+        return future
+
+    def next_batch(self):
+        batch = [self.requests.get()]
+        batch_size = len(batch[0][0])
+        deadline = perf_counter() + self.max_wait
+        while batch_size < self.max_batch_size:
+            timeout = deadline - perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            batch_size += len(request[0])
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            text_corpus = [text for texts, _ in batch for text in texts]
+            t_batch = perf_counter()
+            try:
+                doc_topics = self.topic_model.transform(text_corpus) if text_corpus else np.empty((0, 0))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.metrics.add_batch(len(text_corpus), (perf_counter() - t_batch) * 1000)
+            start = 0
+            for texts, future in batch:
+                future.set_result(doc_topics[start:start + len(texts)])
+                start += len(texts)
+
+def topic_results(topic_model, doc_topics, n_decimals=4):
+    """
+    To convert the document-topic matrix of a request into its json response
+
+    Args:
+        topic_model : sklearn_topic_model or gensim_topic_model
+        doc_topics : Array of float64
+        n_decimals : int
+
+    Returns:
+        list of dict
+    """
+    main_topic = np.argmax(doc_topics, axis=1) if doc_topics.size else np.empty(0, dtype=int)
+    return [{'topics': np.round(row, n_decimals).tolist(), 'main_topic': int(i),
+             'main_topic_%': round(float(row[i]), n_decimals), 'main_topic_words': topic_model.dict_topics.get(int(i))}
+            for row, i in zip(doc_topics, main_topic)]
+
+class inference_request_handler(BaseHTTPRequestHandler):
+    """
+    POST /predict with {"texts": [...]} returns the topic distribution per
+    text; GET /metrics returns the latency stats; GET /health
+    """
+
+    batcher = None
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok', 'model': self.batcher.topic_model.name})
+        elif self.path == '/metrics':
+            self.send_json(200, self.batcher.metrics.summary())
+        else:
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            return self.send_json(404, {'error': f'Unknown path {self.path}'})
+        t_request = perf_counter()
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            text_corpus = body.get('texts') if isinstance(body, dict) else None
+            if not isinstance(text_corpus, list) or not all(isinstance(i, str) for i in text_corpus):
+                raise ValueError("The request body must be a json object with a list of strings as 'texts'")
+            if len(text_corpus) > max_texts_per_request:
+                raise ValueError(f'The request exceeds {max_texts_per_request} texts')
+        except ValueError as e:
+            self.batcher.metrics.add_request(0, (perf_counter() - t_request) * 1000, error=True)
+            return self.send_json(400, {'error': str(e)})
+        try:
+            doc_topics = self.batcher.submit(text_corpus).result()
+        except Exception as e:
+            self.batcher.metrics.add_request(len(text_corpus), (perf_counter() - t_request) * 1000, error=True)
+            return self.send_json(500, {'error': repr(e)})
+        results = topic_results(self.batcher.topic_model, doc_topics)
+        latency_ms = (perf_counter() - t_request) * 1000
+        self.batcher.metrics.add_request(len(text_corpus), latency_ms)
+        self.send_json(200, {'model': self.batcher.topic_model.name, 'results': results, 'latency_ms': round(latency_ms, 2)})
+
+    def log_message(self, format, *args):
+        pass
+
+def inference_server(topic_model, host='127.0.0.1', port=8765, max_batch_size=512, max_wait_ms=10):
+    """
+    To build the http server of a loaded topic model
+
+    Args:
+        topic_model : sklearn_topic_model or gensim_topic_model
+        host : str
+        port : int
+        max_batch_size : int
+        max_wait_ms : float
+
+    Returns:
+        ThreadingHTTPServer
+    """
+    handler = type('inference_request_handler', (inference_request_handler,),
+                   {'batcher': micro_batcher(topic_model, max_batch_size, max_wait_ms)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    global model_backend, path_output_pickled_obj, path_output_artifacts, host, port, max_batch_size, max_wait_ms
+
+    t_start = time()
+    topic_model = load_topic_model(model_backend, path_output_pickled_obj, path_output_artifacts)
+    server = inference_server(topic_model, host, port, max_batch_size, max_wait_ms)
+    print(f"The {model_backend} topic model has been loaded in %0.1fs." % (time() - t_start))
+    print(f"Serving on http://{host}:{server.server_address[1]} (POST /predict, GET /metrics, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -11,19 +11,28 @@ import os.path
 from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer 
 from sklearn.decomposition import LatentDirichletAllocation as LDA
 from sklearn.model_selection import GridSearchCV
+from sklearn.experimental import enable_halving_search_cv
+from sklearn.model_selection import HalvingGridSearchCV
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone
 import pyLDAvis.lda_model
 from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
 import rock_news_nlp_utilities as utils_tpp
+from rock_news_nlp_class_artifact_store import artifact_store
  
 path_parent_dir = os.path.dirname(os.getcwd())
 path_data_data_subsets = f'{path_parent_dir}\\data\\data_subsets'
+path_data_web_scrapers = f'{path_parent_dir}\\data\\web_scrapers'
 path_output = f'{path_parent_dir}\\output'
 path_output_pickled_obj = f'{path_output}\\pickled_objects'
+path_output_artifacts = f'{path_output}\\artifacts'
 path_output_viz = f'{path_output}\\visuals'
 
 dict_grid_search = {'n_components': [5,6,7], 'learning_decay': [.5,.7,.9], 'learning_method': ['online'], 
                     'max_iter': [150], 'n_jobs': [1], 'random_state': [0]}
+n_jobs_grid_search = -1
+halving_grid_search = False
+incremental_training_mode = False
 
 def pipeline(text_corpus, *args, **kwargs):
     """
@@ -64,20 +73,47 @@ def lda(n_components, learning_method, learning_decay, max_iter, random_state):
                 random_state=random_state
                 )
 
-def topics(lda, counts):
+def topic_summary(lda, counts, n_top_words=5, normalize=False):
+    """
+    To get the most relevant words per topic and their weights
+    
+    The vocabulary is computed once and the top words of every topic are 
+    selected with a single argpartition over the components_ matrix.
+    
+    Args:
+        lda : decomposition._lda.LatentDirichletAllocation
+        counts : feature_extraction.text.CountVectorizer
+        n_top_words : int
+        normalize : bool (weights as the probability of the word in the topic)
+        
+    Returns:
+        dict (topic id as key, list of (word, weight) as value)
+    """
+    feature_names = counts.get_feature_names_out()
+    components = lda.components_
+    if normalize:
+        components = components / components.sum(axis=1)[:, np.newaxis]
+    n_top_words = min(n_top_words, components.shape[1])
+    top_idx = np.argpartition(components, -n_top_words, axis=1)[:, -n_top_words:]
+    top_weights = np.take_along_axis(components, top_idx, axis=1)
+    order = np.argsort(-top_weights, axis=1)
+    top_idx = np.take_along_axis(top_idx, order, axis=1)
+    top_weights = np.take_along_axis(top_weights, order, axis=1)
+    return {i: list(zip(feature_names[top_idx[i]].tolist(), top_weights[i].tolist())) for i in range(lda.n_components)}
+
+def topics(lda, counts, n_top_words=5):
     """
     To get the most relevant words per topic 
     
     Args:
         lda : decomposition._lda.LatentDirichletAllocation
-        counts : sparce.csr.csr_matrix
+        counts : feature_extraction.text.CountVectorizer
+        n_top_words : int
         
     Returns:
         dict
     """
-    topic_id = [i for i in range(lda.n_components)]
-    top_words = [[counts.get_feature_names_out()[i] for i in j.argsort()[-5:][::-1]] for i, j in enumerate(lda.components_)]
-    return dict(zip(topic_id, top_words))
+    return {k: [i[0] for i in v] for k, v in topic_summary(lda, counts, n_top_words).items()}
     
 def df_output(lda_array, dict_topics):
     """
@@ -98,30 +134,70 @@ def df_output(lda_array, dict_topics):
     df_lda_output['main_topic_words'] = df_lda_output['main_topic'].map(dict_topics)
     return df_lda_output
     
-def grid_search(dict_grid_search, word_freq_count):
+def perplexity_score(lda, word_freq_count, y=None):
+    """
+    To score an lda model by its perplexity (negated, as higher scores are 
+    better)
+    
+    Args:
+        lda : decomposition._lda.LatentDirichletAllocation
+        word_freq_count : sparce.csr.csr_matrix
+        y : None
+    
+    Returns:
+        float64
+    """
+    return -lda.perplexity(word_freq_count)
+
+def grid_search(dict_grid_search, word_freq_count, n_jobs=None, halving=False, factor=3):
     """
     To search optimal hyperparameters
     
+    Every (configuration, fold) fit is dispatched to a pool of n_jobs worker
+    processes (joblib already memory-maps the large arrays of the word counts
+    matrix for the workers by default, so they are not pickled for every 
+    fit). With halving=True, a successive halving search on max_iter trains
+    every configuration for a few iterations and only keeps the best 
+    1/factor configurations (lowest perplexity) for the next round, with 
+    factor times more iterations, up to the max_iter of the grid; as the 
+    last round can stop below it, the best configuration is refit with the 
+    max_iter of the grid.
+    
     Args:
         dict_grid_search : dict
         word_freq_count : sparce.csr.csr_matrix
+        n_jobs : int
+        halving : bool
+        factor : int
     
     Returns:
-        model_selection._search.GridSearchCV
+        model_selection._search.GridSearchCV or HalvingGridSearchCV
     """
     lda = LDA()
-    gs_model = GridSearchCV(lda, param_grid=dict_grid_search)
+    if halving:
+        max_iter = max(dict_grid_search.get('max_iter', [lda.max_iter]))
+        param_grid = {k: v for k, v in dict_grid_search.items() if k != 'max_iter'}
+        gs_model = HalvingGridSearchCV(lda, param_grid=param_grid, factor=factor, resource='max_iter', 
+                                       max_resources=max_iter, min_resources='exhaust', scoring=perplexity_score,
+                                       n_jobs=n_jobs, random_state=0)
+    else:
+        gs_model = GridSearchCV(lda, param_grid=dict_grid_search, n_jobs=n_jobs)
     gs_model.fit(word_freq_count)
+    ### THE LAST HALVING ROUND MAY USE FEWER ITERATIONS THAN THE GRID (E.G. 144 OF 150), SO THE BEST CONFIGURATION IS REFIT WITH THE MAX_ITER OF THE GRID
+    if halving and gs_model.best_estimator_.max_iter != max_iter:
+        gs_model.best_params_ = {**gs_model.best_params_, 'max_iter': max_iter}
+        gs_model.best_estimator_ = clone(gs_model.best_estimator_).set_params(max_iter=max_iter).fit(word_freq_count)
     return gs_model
 
-def topic_prediction(unseen_text_corpus, lda_model, word_freq_count):
+def topic_prediction(unseen_text_corpus, lda_model, word_freq_count, dict_topics=None):
     """
     To predict topics on unseen text corpus
     
     Args:
         unseen_text_corpus : list
         lda_model : decomposition._lda.LatentDirichletAllocation
-        word_freq_count : sparce.csr.csr_matrix
+        word_freq_count : feature_extraction.text.CountVectorizer
+        dict_topics : dict, default None (output of topics, computed if None)
     
     Returns:
         Array of float64, list
@@ -129,9 +205,40 @@ def topic_prediction(unseen_text_corpus, lda_model, word_freq_count):
     text_corpus_clean = tpp.text_preprocessing_to_sklearn(unseen_text_corpus)    
     word_freq_count_pred = word_freq_count.transform(text_corpus_clean)
     lda_array = lda_model.transform(word_freq_count_pred)
-    dict_topics = topics(lda_model, word_freq_count)
+    if dict_topics is None:
+        dict_topics = topics(lda_model, word_freq_count)
     return text_corpus_clean, word_freq_count_pred, lda_array, dict_topics 
 
+def incremental_training(text_corpus, article_keys, lda_model, vectorizer, set_absorbed_articles, batch_size=None):
+    """
+    To update a trained lda model with the articles which have not been 
+    absorbed yet, streamed through partial_fit in mini-batches
+    
+    The vocabulary of the fitted vectorizer is kept as it is, so words unseen
+    during the full training are ignored.
+    
+    Args:
+        text_corpus : list
+        article_keys : list (e.g. full_pk)
+        lda_model : decomposition._lda.LatentDirichletAllocation
+        vectorizer : feature_extraction.text.CountVectorizer
+        set_absorbed_articles : set
+        batch_size : int, default lda_model.batch_size
+    
+    Returns:
+        decomposition._lda.LatentDirichletAllocation, set, int
+    """
+    batch_size = batch_size or lda_model.batch_size
+    dict_new_articles = {k: t for k, t in zip(article_keys, text_corpus) if k not in set_absorbed_articles}
+    list_new_articles = list(dict_new_articles.items())
+    lda_model.set_params(total_samples=len(set_absorbed_articles) + len(list_new_articles))
+    for i in range(0, len(list_new_articles), batch_size):
+        keys, texts = zip(*list_new_articles[i:i+batch_size])
+        word_freq_count = vectorizer.transform(tpp.text_preprocessing_to_sklearn(list(texts)))
+        lda_model.partial_fit(word_freq_count)
+        set_absorbed_articles.update(keys)
+    return lda_model, set_absorbed_articles, len(list_new_articles)
+
 def model_viz(text_corpus, lda_model, vectorizer, path, filename):
     """
     To bring out a visual overview of the lda model
@@ -157,21 +264,54 @@ def model_viz(text_corpus, lda_model, vectorizer, path, filename):
     return pyLDAvis.save_html(lda_visual, f'{path}/{filename}.html')
 
 def main():
-    global path_data_web_scrapers, path_output, dict_grid_search
+    global path_data_web_scrapers, path_output, dict_grid_search, n_jobs_grid_search, halving_grid_search
      
     text_corpus = utils_tpp.load_text_corpus(path_data_data_subsets, 'rock_news_train_set.csv', ';', None, 'title')
     text_corpus_clean = tpp.text_preprocessing_to_sklearn(text_corpus)
     pipe = pipeline(text_corpus_clean,analyzer='word', min_df=10, ngram_range=(1, 2))
     x_counts = pipe['count'].transform(text_corpus_clean)
-    gs_model = grid_search(dict_grid_search,x_counts)
+    gs_model = grid_search(dict_grid_search,x_counts,n_jobs=n_jobs_grid_search,halving=halving_grid_search)
     best_lda_model = gs_model.best_estimator_
     model_perplexity = best_lda_model.perplexity(x_counts)
-    best_log_likelihood_score = gs_model.best_score_
+    ### SAME STAT IN BOTH SEARCH MODES: THE LOG-LIKELIHOOD OF THE BEST MODEL ON THE TRAINING COUNTS
+    best_log_likelihood_score = best_lda_model.score(x_counts)
     topics_lda = topics(best_lda_model, pipe['count'])
     # utils_tpp.save_py_object(best_lda_model, path_output_pickled_obj, 'sklearn_train_lda_model.pickle')
     # utils_tpp.save_py_object(pipe['count'], path_output_pickled_obj, 'sklearn_train_vectorizer.pickle')
+    # utils_tpp.save_py_object(topics_lda, path_output_pickled_obj, 'sklearn_train_topics.pickle')
+    # artifact_store(path_output_artifacts, 'sklearn_lda').save({'lda_model': best_lda_model, 'count_vec': pipe['count'], 'dict_topics': topics_lda})
+    # tpp.stemmer.save(path_output_pickled_obj, 'text_preprocessing_stem_cache.pickle')
     # model_viz(text_corpus_clean, best_lda_model, pipe['count'], path_output_viz, 'sklearn_train_lda_model_viz')
     utils_tpp.print_lda_model_topics_stats(topics_lda,model_perplexity,best_log_likelihood_score)
 
+def main_incremental():
+    global path_data_web_scrapers, path_output_pickled_obj, path_output_artifacts
+    
+    df_rock_news = pd.read_csv(f'{path_data_web_scrapers}/rock_news.csv', sep=';', usecols=['title','full_pk'])
+    ### THE HELD-OUT (TEST SET) ARTICLES MUST NEVER BE ABSORBED, OTHERWISE ANY EVALUATION ON THE TEST SUBSET IS CONTAMINATED
+    set_test_articles = set(pd.read_csv(f'{path_data_data_subsets}/rock_news_test_set.csv', sep=';', usecols=['full_pk'])['full_pk'])
+    df_rock_news = df_rock_news[~df_rock_news['full_pk'].isin(set_test_articles)]
+    lda_model = utils_tpp.load_py_object('lda_model', path_output_pickled_obj, 'sklearn_train_lda_model.pickle')
+    count_vec = utils_tpp.load_py_object('count_vec', path_output_pickled_obj, 'sklearn_train_vectorizer.pickle')
+    if os.path.exists(f'{path_output_pickled_obj}/sklearn_train_absorbed_articles.pickle'):
+        set_absorbed_articles = utils_tpp.load_py_object('set_absorbed_articles', path_output_pickled_obj, 'sklearn_train_absorbed_articles.pickle')
+    else:
+        set_absorbed_articles = set(pd.read_csv(f'{path_data_data_subsets}/rock_news_train_set.csv', sep=';', usecols=['full_pk'])['full_pk'])
+    lda_model, set_absorbed_articles, nr_new_articles = incremental_training(df_rock_news['title'].to_list(), df_rock_news['full_pk'].to_list(), 
+                                                                            lda_model, count_vec, set_absorbed_articles)
+    if nr_new_articles:
+        topics_lda = topics(lda_model, count_vec)
+        utils_tpp.save_py_object(topics_lda, path_output_pickled_obj, 'sklearn_train_topics.pickle')
+        store = artifact_store(path_output_artifacts, 'sklearn_lda')
+        if store.exists():
+            store.save({'lda_model': lda_model, 'count_vec': count_vec, 'dict_topics': topics_lda}, 
+                       metadata={'absorbed_articles': len(set_absorbed_articles)})
+    utils_tpp.save_py_object(lda_model, path_output_pickled_obj, 'sklearn_train_lda_model.pickle')
+    utils_tpp.save_py_object(set_absorbed_articles, path_output_pickled_obj, 'sklearn_train_absorbed_articles.pickle')
+    print(f'{nr_new_articles} new articles absorbed by the lda model')
+
 if __name__ == "__main__":
-    main()
+    if incremental_training_mode:
+        main_incremental()
+    else:
+        main()
@@ -7,6 +7,7 @@ Created on Sun Aug  6 17:51:13 2023
 import os
 import os.path
 import rock_news_nlp_lda_sklearn as lda_sklearn
+from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
 import rock_news_nlp_utilities as utils_tpp
 from time import time
 
@@ -25,11 +26,16 @@ path_output_csv = f'{path_output}\\csv'
 text_corpus = utils_tpp.load_text_corpus(path_data_data_subsets, 'rock_news_test_set.csv', ';', None, 'title')
 lda_model = utils_tpp.load_py_object('lda_model', path_output_pickled_obj, 'sklearn_train_lda_model.pickle')
 count_vec = utils_tpp.load_py_object('count_vec', path_output_pickled_obj, 'sklearn_train_vectorizer.pickle')
+tpp.stemmer.load(path_output_pickled_obj, 'text_preprocessing_stem_cache.pickle')
+if os.path.exists(f'{path_output_pickled_obj}/sklearn_train_topics.pickle'):
+    dict_topics = utils_tpp.load_py_object('dict_topics', path_output_pickled_obj, 'sklearn_train_topics.pickle')
+else:
+    dict_topics = lda_sklearn.topics(lda_model, count_vec)
 
 #==============================================================================
 # 2. EVALUATE THE MODEL
 #==============================================================================
-text_corpus_clean, word_freq_count_pred, lda_array, dict_topics = lda_sklearn.topic_prediction(text_corpus, lda_model, count_vec)
+text_corpus_clean, word_freq_count_pred, lda_array, dict_topics = lda_sklearn.topic_prediction(text_corpus, lda_model, count_vec, dict_topics)
 lda_sklearn_test_subset_output = lda_sklearn.df_output(lda_array, dict_topics)
 lda_sklearn_test_subset_output.insert(0,'title',text_corpus)
 lda_sklearn_test_subset_output.to_csv(f'{path_output_csv}/rock_news_nlp_lda_sklearn_test_subset_output.csv', header=True, index=False, encoding='utf-8',sep=';')
@@ -8,27 +8,61 @@ Created on Sat Feb 19 18:12:13 2022
 # For proof of concept, this web scraper is restricted to the loudwire website
 #==============================================================================
 
-import requests
 from bs4 import BeautifulSoup 
 import pandas as pd 
 import numpy as np 
 import os
 from datetime import datetime
-from time import time, sleep
-from random import randint
+from time import time
+from rock_news_nlp_class_fetch_engine import fetch_engine, requests_transport
+from rock_news_nlp_class_http_cache import cached_transport
+from rock_news_nlp_class_link_index import link_index
+from rock_news_nlp_html_parsing import news_article_attributes, news_article_attributes_soup
 
-def get_links_loudwire(nr_pages, links_web_data_source):
+fetch_max_workers = 4
+fetch_rate_per_host = 1.0
+fetch_max_retries = 3
+http_cache_offline = False
+http_cache_max_bytes = 512*1024*1024
+crawl_until_known = True
+crawl_max_pages = 50
+fast_html_parsing = True
+
+def parse_links_loudwire(content):
+    """
+    To get the news articles links of a loudwire website page
+    
+    Args:
+        content : bytes
+        
+    Returns:
+        list
+    """
+    multiple_links = []
+    try:
+        soup = BeautifulSoup(content, 'html.parser')    
+        newslinksection = soup.find_all('a',attrs={'class':'theframe'}, href=True)
+        for j in newslinksection:
+            if j['href'].count('/')==4:
+                multiple_links.append("https:" + j['href'])
+    except:
+        pass   
+    return multiple_links
+
+def get_links_loudwire(nr_pages, links_web_data_source, engine=None, website='https://loudwire.com/category/news/'):
     """
     To compile a list of news articles links from the loudwire website pages 
     
     Args:
         nr_pages : int
-        links_web_data_source : list
+        links_web_data_source : set or link_index
+        engine : fetch_engine, default None (a new fetch_engine)
+        website : str
         
     Returns:
         list
     """
-    website = 'https://loudwire.com/category/news/'
+    engine = engine if engine is not None else fetch_engine()
     links_pages = []
     multiple_links = []
     
@@ -37,47 +71,69 @@ def get_links_loudwire(nr_pages, links_web_data_source):
     
     links_pages.append(website)
  
-    for i in links_pages:
-        try:
-            page = requests.get(i)
-            soup = BeautifulSoup(page.content, 'html.parser')    
-            newslinksection = soup.find_all('a',attrs={'class':'theframe'}, href=True)
-            for j in newslinksection:
-                if j['href'].count('/')==4:
-                    multiple_links.append("https:" + j['href'])
-        except:
-            pass   
-        sleep(randint(2,5))
+    for page in engine.fetch_all(links_pages):
+        if page.status_code == 200:
+            multiple_links.extend(parse_links_loudwire(page.content))
         
     multiple_links = list(set(multiple_links))
     
     return [i for i in multiple_links if i not in links_web_data_source]  
 
-def extract_news_articles_attributes(links):
+def crawl_links_loudwire(links_web_data_source, engine=None, website='https://loudwire.com/category/news/', max_pages=50):
+    """
+    To compile a list of the new news articles links walking the loudwire 
+    website pages newest-first, until a page contains only already known links
+    
+    The pages are fetched in batches of engine.max_workers and checked in order.
+    
+    Args:
+        links_web_data_source : set or link_index
+        engine : fetch_engine, default None (a new fetch_engine)
+        website : str
+        max_pages : int
+        
+    Returns:
+        list
+    """
+    engine = engine if engine is not None else fetch_engine()
+    links_pages = [website] + [f'{website}/page/{str(i)}/' for i in range(2,max_pages+1)]
+    new_links = {}
+    
+    for i in range(0, len(links_pages), engine.max_workers):
+        for page in engine.fetch_all(links_pages[i:i+engine.max_workers]):
+            if page.status_code != 200:
+                return list(new_links)
+            page_links = [j for j in parse_links_loudwire(page.content) if j not in links_web_data_source]
+            if not page_links:
+                return list(new_links)
+            new_links.update(dict.fromkeys(page_links))
+    
+    return list(new_links)
+
+def extract_news_articles_attributes(links, engine=None, fast_parsing=True):
     """
     To extract and store the attributes of every single news article
  
     Args:
         links : list
+        engine : fetch_engine, default None (a new fetch_engine)
+        fast_parsing : bool (lxml xpath instead of a full BeautifulSoup tree)
         
     Returns:
         DataFrame
     """   
+    engine = engine if engine is not None else fetch_engine()
     web_data = {"website": [], "title": [], "description": [], "body": [], "date": [], "link": []}
     
-    for i in links:
-        try:
-            page = requests.get(i)
-            soup = BeautifulSoup(page.content, 'html.parser')
-            web_data['website'].append(soup.find('meta', attrs={'property':'og:site_name'})['content'])
-            web_data['title'].append(soup.find('meta', attrs={'property':'og:title'})['content'])                
-            web_data['description'].append(soup.find('meta', attrs={'property':'og:description'})['content'])
-            web_data['body'].append(soup.find('div',attrs={'class':'content'}).text.strip())
-            web_data['date'].append(soup.find('meta', attrs={'name':'sailthru.date'})['content'])
-            web_data['link'].append(i)
-        except:
-            pass
-        sleep(randint(2,5))
+    for page in engine.fetch_all(links):
+        if page.status_code != 200:
+            continue
+        article = news_article_attributes(page.content) if fast_parsing else news_article_attributes_soup(page.content)
+        if article is None:
+            continue
+        article['link'] = page.url
+        for k, v in article.items():
+            web_data[k].append(v)
         
     return  pd.DataFrame(web_data)
 
@@ -122,13 +178,22 @@ df_rock_news = pd.read_csv(f'{path_data_web_scrapers}/rock_news.csv',sep=';')
 df_rock_news['date'] = pd.to_datetime(df_rock_news['date']).dt.date
 max_date_bysite = df_rock_news.groupby(['website']).agg({'date': np.max})
 last_date = max_date_bysite['date'].min()
-list_links = df_rock_news['link'].tolist()                                    
+### THE LINKS OF THE CSV FILE ONLY SEED THE INDEX WHEN ITS FILE DOES NOT EXIST YET
+links_index = link_index(f'{path_data_web_scrapers}/rock_news_links.txt', df_rock_news['link'])
 
 #==============================================================================
 # 2. WEB SCRAPING TASKS AND INCREMENTAL LOAD
 #==============================================================================
-multiple_links = get_links_loudwire(4, list_links)                                              
-df_rock_news_delta = extract_news_articles_attributes(multiple_links)  
+transport = cached_transport(requests_transport(pool_maxsize=fetch_max_workers), f'{path_data_web_scrapers}/http_cache.sqlite', 
+                             max_bytes=http_cache_max_bytes, offline=http_cache_offline)
+engine = fetch_engine(transport, max_workers=fetch_max_workers, rate_per_host=fetch_rate_per_host, max_retries=fetch_max_retries)
+if crawl_until_known:
+    multiple_links = crawl_links_loudwire(links_index, engine, max_pages=crawl_max_pages)
+else:
+    multiple_links = get_links_loudwire(4, links_index, engine)                                              
+df_rock_news_delta = extract_news_articles_attributes(multiple_links, engine, fast_html_parsing)  
+engine.close()
 df_rock_news_updated = incremental_load(df_rock_news_delta, df_rock_news, last_date)
 # df_rock_news_updated.to_csv(f'{path_data_web_scrapers}/rock_news.csv', header=True, index=False, encoding='utf-8',sep=';')
+# links_index.update(df_rock_news_updated['link'])
 print("...it has been successfully executed in %0.1fs." % (time() - t_start))
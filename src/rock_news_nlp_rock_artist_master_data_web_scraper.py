@@ -8,27 +8,39 @@ Created on Thu Apr 28 19:12:33 2022
 # For proof of concept, this web scraper is restricted to the acid rock subgenre
 #================================================================================
 
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import os
 import re
-from time import time, sleep
-from random import randint
+from time import time
+from rock_news_nlp_class_fetch_engine import fetch_engine, requests_transport
+from rock_news_nlp_class_http_cache import cached_transport
+from rock_news_nlp_html_parsing import infobox_table
 
-def get_rock_subgenre_links(website):
+fetch_max_workers = 4
+fetch_rate_per_host = 0.5
+fetch_max_retries = 3
+http_cache_offline = False
+http_cache_max_bytes = 512*1024*1024
+fast_html_parsing = True
+
+def get_rock_subgenre_links(website, engine=None):
     """
     To compile Wikipedia lists of links on rock subgenres
     
     Args:
         website : str
+        engine : fetch_engine, default None (a new fetch_engine)
         
     Returns:
- 	list
+ 	list (empty if the page could not be fetched)
     """
-    page = requests.get(website)
-    soup = BeautifulSoup(page.content, 'html.parser')
+    engine = engine if engine is not None else fetch_engine()
+    page = engine.fetch(website)
     links_subgenres = []
+    if page.status_code != 200 or page.content is None:
+        return links_subgenres
+    soup = BeautifulSoup(page.content, 'html.parser')
         
     for i in soup.find_all('div', attrs={'class':'mw-category-group'}):
         for j in i.find_all('a'):
@@ -37,21 +49,24 @@ def get_rock_subgenre_links(website):
                 
     return links_subgenres            
 
-def get_rock_artist_links(links_subgenres):
+def get_rock_artist_links(links_subgenres, engine=None):
     """
     To compile a list of Wikipedia links on rock artists
     
     Args:
         links_subgenres : list
+        engine : fetch_engine, default None (a new fetch_engine)
         
     Returns:
 	list
     """ 
+    engine = engine if engine is not None else fetch_engine()
     links_rock_artist = []
     rock_artist_genre = []
 
-    for i in links_subgenres:
-        page = requests.get(i)
+    for i, page in zip(links_subgenres, engine.fetch_all(links_subgenres)):
+        if page.content is None:
+            continue
         soup = BeautifulSoup(page.content, 'html.parser')
         rock_genre = re.search(r'^.+/List_of_(.+)$', i).group(1) 
         
@@ -60,28 +75,28 @@ def get_rock_artist_links(links_subgenres):
                 if '#cite' not in k['href']:
                     links_rock_artist.append('https://en.wikipedia.org'+k['href'])
                     rock_artist_genre.append(rock_genre)                
-        sleep(randint(2,5))
         
     return links_rock_artist, rock_artist_genre
 
-def extract_wiki_artist_infobox_attributes(links_rock_artist, rock_artist_genre):
+def extract_wiki_artist_infobox_attributes(links_rock_artist, rock_artist_genre, engine=None, fast_parsing=True):
     """
     To extract and store the Wikipedia infobox attributes of rock artists
  
     Args:
         links_rock_artist : list
         rock_artist_genre : list
+        engine : fetch_engine, default None (a new fetch_engine)
+        fast_parsing : bool (parse only the infobox table with the fastest parser)
         
     Returns:
  	DataFrame
     """   
+    engine = engine if engine is not None else fetch_engine()
     web_data = {"rock_artist": [], "genre": [], "label": [], "description": []}
 
-    for i,j in zip(links_rock_artist, rock_artist_genre):
+    for page,j in zip(engine.fetch_all(links_rock_artist), rock_artist_genre):
         try: 
-            page = requests.get(i)
-            soup = BeautifulSoup(page.content, 'html.parser')
-            infobox = soup.find('table', attrs={'class':'infobox vcard plainlist'})
+            infobox = infobox_table(page.content, fast_parsing)
             
             try: 
                 labels = infobox.find_all('th', attrs={'class':'infobox-label'})
@@ -112,7 +127,6 @@ def extract_wiki_artist_infobox_attributes(links_rock_artist, rock_artist_genre)
                 pass 
         except:
             pass 
-        sleep(randint(2,5))
         
     wiki_list_rock_artist = pd.DataFrame(web_data)        
     wiki_list_rock_artist = wiki_list_rock_artist.assign(full_pk = [i.replace(" ", "").upper()+j.replace(" ", "").upper()+k.replace(" ", "").upper() 
@@ -143,9 +157,13 @@ condition_html_ul_wo_list = "(((len(l.find_all('div', attrs={'class':'hlist'}))>
 condition_html_br = "(len(l.find_all('br'))>0)==True"
 
 ## EXCTRACT WEB DATA
-links_subgenres = get_rock_subgenre_links("https://en.wikipedia.org/wiki/Category:Lists_of_rock_musicians_by_subgenre")
+transport = cached_transport(requests_transport(pool_maxsize=fetch_max_workers), f'{path_data_web_scrapers}/http_cache.sqlite', 
+                             max_bytes=http_cache_max_bytes, offline=http_cache_offline)
+engine = fetch_engine(transport, max_workers=fetch_max_workers, rate_per_host=fetch_rate_per_host, max_retries=fetch_max_retries)
+links_subgenres = get_rock_subgenre_links("https://en.wikipedia.org/wiki/Category:Lists_of_rock_musicians_by_subgenre", engine)
 links_subgenres = [i for i in links_subgenres if "acid" in i]
-links_rock_artist, rock_artist_genre = get_rock_artist_links(links_subgenres)
-wiki_list_acid_rock_artist = extract_wiki_artist_infobox_attributes(links_rock_artist, rock_artist_genre)
+links_rock_artist, rock_artist_genre = get_rock_artist_links(links_subgenres, engine)
+wiki_list_acid_rock_artist = extract_wiki_artist_infobox_attributes(links_rock_artist, rock_artist_genre, engine, fast_html_parsing)
+engine.close()
 # wiki_list_acid_rock_artist.to_csv(f'{path_data_web_scrapers}/wiki_list_acid_rock_artist.csv', header=True, index=False, encoding='utf-8',sep=';')
 print("...it has been successfully executed in %0.1fs." % (time() - t_start))
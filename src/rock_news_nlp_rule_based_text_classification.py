@@ -8,113 +8,273 @@ import pandas as pd
 import numpy as np
 import os
 import os.path
+import re
+from itertools import islice
 from time import time
 from rock_news_nlp_class_text_preprocessing import text_preprocessing as tpp
-import rock_news_nlp_utilities as utils_tpp
+from rock_news_nlp_class_rule_engine import rule_engine
+from rock_news_nlp_class_tag_lists import tag_lists
 
-print("The script is running...")
-t_start = time()
-
-#==============================================================================
-# 1. TEXT PREPROCESSING
-#==============================================================================
-
-## 1.1. LOAD DATA
 path_parent_dir = os.path.dirname(os.getcwd())
 path_data = f'{path_parent_dir}\data'
 path_data_web_scrapers = f'{path_data}\web_scrapers'
 path_data_support_files = f'{path_data}\support_files'
 path_output_csv = f'{path_parent_dir}\output\csv'
+path_output_sparse = f'{path_parent_dir}\output\sparse'
+### SAVE THE TAGS ALSO AS SPARSE DOCUMENT X LABEL INDICATOR MATRICES (.npz)
+sparse_output = False
+
+class RuleBasedClassifier:
+    """
+    Rule-based classifier of rock news headlines into type of publication
+    tags and topic (sub-category and category) labels
+
+    The category dictionary, the keyword rules and the type of publication
+    rules are compiled once, so classify and classify_stream only cost the
+    preprocessing and the classification of the given batch.
+    """
+
+    set_is_story = set(['how ','musicians ','why ','who is ','who are ','when ','what ','this ',"here's ",'that time ','opinion |', 'odd couples: '])
+    set_verbs_opinion = set(['reflect','think','say','explain','admit'])
+    set_verbs_reaction = set(['react','respond'])
+    type_publication_rules = [('story', 'prep', 'startswith', set_is_story),
+                              ('musical list', 'prep', 'contains', ['best rock + metal songs', 'rock + metal bands']),
+                              ('recall event', 'prep', 'contains', ['years ago:', 'years ago -']),
+                              ('opinion', 'clean', 'word', set_verbs_opinion),
+                              ('reaction', 'clean', 'word', set_verbs_reaction),
+                              ('video/audio', 'clean', 'word', ['watch', 'video']),
+                              ('video/audio', 'clean', 'startswith', ['see ', 'listen ', 'hear ']),
+                              ('poll/tourney', 'clean', 'word', ['poll', 'rrhof tourney']),
+                              ('birthday reminder', 'prep', 'all_words', ['birthdays', 'celebrating'])]
+    list_tag_columns = ['keywords','sub_category_tags','category_tags','type_publication']
+    ### FALLBACK LABELS OF THE TEXTS WITHOUT TAGS, ONLY APPLIED TO THE LISTS (NOT PART OF THE LABEL VOCABULARIES)
+    dict_default_tags = {'sub_category_tags': ['diverse topics'], 'category_tags': ['diverse topics'], 'type_publication': ['general']}
+
+    def __init__(self, df_dict_category):
+        ## CREATE SUPPORT DICTIONARIES AND SETS
+        df_dict_category = df_dict_category.copy()
+        df_dict_category['keyword_stem'] = df_dict_category['keyword'].apply(lambda i: ''.join(tpp.stem_word(tpp.token(i))))
+        self.set_category_tags = set(df_dict_category['keyword_stem'])
+        self.dict_stem_keywords = df_dict_category.groupby('keyword_stem')['keyword'].agg('first').to_dict()
+        self.dict_sub_category_tag_all = df_dict_category[df_dict_category['bool_type']=='all'].groupby('sub_category')['keyword_stem'].agg(set).to_dict()
+        self.dict_sub_category_tag_any = df_dict_category[df_dict_category['bool_type']=='any'].groupby('sub_category')['keyword_stem'].agg(set).to_dict()
+        self.dict_category_tag = df_dict_category.groupby('sub_category')['category'].agg('first').to_dict()
+        self.sub_category_rules = rule_engine(self.set_category_tags, self.dict_sub_category_tag_all, self.dict_sub_category_tag_any)
+        self.type_publication_labels, self.type_publication_patterns = self.compile_type_publication_rules(self.type_publication_rules)
+
+    @staticmethod
+    def compile_type_publication_rules(type_publication_rules):
+        """
+        To compile the declarative type of publication rules (label, corpus, 
+        rule type, keywords) into regex patterns: 'startswith' and 'contains' 
+        match any keyword, 'word' any whole keyword (as tpp.word_search) and 
+        'all_words' every whole keyword; the rules of the same label are 
+        combined with or
+
+        Args:
+            type_publication_rules : list
+
+        Returns:
+            Array of object (labels), list (label id, corpus, list of patterns)
+        """
+        labels = list(dict.fromkeys(i[0] for i in type_publication_rules))
+        dict_pattern = {'startswith': lambda i: f'^(?:{i})', 'contains': lambda i: f'(?:{i})', 
+                        'word': lambda i: f'(?<![^ ])(?:{i})(?![^ ])'}
+        type_publication_patterns = []
+        for label, corpus_name, rule_type, keywords in type_publication_rules:
+            keywords = sorted(keywords)
+            if rule_type == 'all_words':
+                list_patterns = [dict_pattern['word'](re.escape(i)) for i in keywords]
+            else:
+                list_patterns = [dict_pattern[rule_type]('|'.join(re.escape(i) for i in keywords))]
+            type_publication_patterns.append((labels.index(label), corpus_name, list_patterns))
+        return np.array(labels, dtype=object), type_publication_patterns
+
+    @classmethod
+    def from_support_files(cls, path):
+        """
+        To compile the classifier from the support files
+
+        Args:
+            path : str
+
+        Returns:
+            RuleBasedClassifier
+        """
+        return cls(pd.read_csv(f'{path}/support_text_class_news_category_dict.csv',sep=';'))
+
+    def type_publication_matrix(self, corpus_title, corpus_title_clean):
+        """
+        To evaluate the type of publication rules: the rules on the 
+        preparatory corpus (stop words & punctuation kept) and on the clean 
+        corpus are run as vectorized regex column operations 
+
+        Args:
+            corpus_title : list
+            corpus_title_clean : list
+
+        Returns:
+            Array of bool, shape (number of texts, number of type of publication labels)
+        """
+        dict_corpus = {'prep': pd.Series(corpus_title, dtype=object), 'clean': pd.Series(corpus_title_clean, dtype=object)}
+        matrix = np.zeros((len(corpus_title), len(self.type_publication_labels)), dtype=bool)
+        for label_id, corpus_name, list_patterns in self.type_publication_patterns:
+            mask = np.ones(len(corpus_title), dtype=bool)
+            for pattern in list_patterns:
+                mask &= dict_corpus[corpus_name].str.contains(pattern, regex=True).to_numpy(dtype=bool)
+            matrix[:, label_id] |= mask
+        return matrix
+
+    def type_publication_tags(self, matrix):
+        """
+        To convert the type of publication matrix into the sorted labels per 
+        text
+
+        Args:
+            matrix : Array of bool
+
+        Returns:
+            tag_lists
+        """
+        return tag_lists.from_matrix(matrix, self.type_publication_labels)
+
+    def sub_category_tags(self, corpus_title_clean):
+        """
+        To return the keywords and the subcategory topic labels per text
+
+        Args:
+            corpus_title_clean : list
+
+        Returns:
+            DataFrame
+        """
+        return pd.DataFrame(self.sub_category_rules.transform(corpus_title_clean))
+
+    def category_tags(self, df_sub_category_tags):
+        """
+        To return the keywords, the subcategory and the category topic labels 
+        per text: a text keeps its tags only if it has a keyword (other than 
+        the ones containing "new") and a subcategory with a category; the 
+        tags are deduplicated and sorted
+
+        Args:
+            df_sub_category_tags : DataFrame
+
+        Returns:
+            dict (column name as key, tag_lists as value)
+        """
+        keywords = tag_lists.from_lists(df_sub_category_tags['keywords'].to_list())
+        keywords = keywords.map(self.dict_stem_keywords).filter(lambda i: 'new' not in str(i))
+        sub_category_tags = tag_lists.from_lists(df_sub_category_tags['sub_category_tags'].to_list())
+        sub_category_tags = sub_category_tags.filter(lambda i: pd.notnull(self.dict_category_tag.get(i)))
+        mask_docs = (keywords.lengths() > 0) & (sub_category_tags.lengths() > 0)
+        keywords = keywords.mask_docs(mask_docs).unique_sorted()
+        sub_category_tags = sub_category_tags.mask_docs(mask_docs)
+        category_tags = sub_category_tags.map(self.dict_category_tag).unique_sorted()
+        return {'keywords': keywords, 'sub_category_tags': sub_category_tags.unique_sorted(), 'category_tags': category_tags}
+
+    def classify_tag_lists(self, texts):
+        """
+        To classify a batch of headlines into tag lists, without the fallback
+        labels (e.g. to build sparse indicator matrices)
+
+        Args:
+            texts : list
+
+        Returns:
+            dict (column name as key, tag_lists as value)
+        """
+        ## PREPARATORY TEXT PREPROCESSING
+        corpus_title = tpp.text_preprocessing_rule_based_txt_class_prep(list(texts))
+
+        ## CORE TEXT PREPROCESSING TASKS
+        corpus_title_clean = tpp.text_preprocessing_rule_based_txt_class(corpus_title)
+
+        ## TYPE OF PUBLICATION TAGS AND NEWS ARTICLE TOPIC LABELS
+        dict_tag_lists = self.category_tags(self.sub_category_tags(corpus_title_clean))
+        dict_tag_lists['type_publication'] = self.type_publication_tags(self.type_publication_matrix(corpus_title, corpus_title_clean))
+        return dict_tag_lists
+
+    def tags_frame(self, texts, dict_tag_lists):
+        """
+        To build the classification DataFrame from the tag lists, with the 
+        fallback labels of the texts without tags
+
+        Args:
+            texts : list
+            dict_tag_lists : dict (see classify_tag_lists)
+
+        Returns:
+            DataFrame (title, keywords, sub_category_tags, category_tags and
+                       type_publication per text)
+        """
+        return pd.DataFrame({'title': list(texts), **{i: dict_tag_lists[i].to_lists(self.dict_default_tags.get(i)) for i in self.list_tag_columns}})
+
+    def classify(self, texts):
+        """
+        To classify a batch of headlines
+
+        Args:
+            texts : list
+
+        Returns:
+            DataFrame (title, keywords, sub_category_tags, category_tags and
+                       type_publication per text)
+        """
+        texts = list(texts)
+        if not texts:
+            return pd.DataFrame({'title': []}).assign(**{i: [] for i in self.list_tag_columns})
+        return self.tags_frame(texts, self.classify_tag_lists(texts))
+
+    def classify_stream(self, iterable, batch_size=1000):
+        """
+        To classify a stream of headlines in batches
+
+        Args:
+            iterable : iterable
+            batch_size : int
+
+        Returns:
+            generator of DataFrame (one per batch, indexed by the position
+                                    of the headline in the stream)
+        """
+        iterator = iter(iterable)
+        start = 0
+        for batch in iter(lambda: list(islice(iterator, batch_size)), []):
+            df_batch = self.classify(batch)
+            df_batch.index = pd.RangeIndex(start, start + len(batch))
+            start += len(batch)
+            yield df_batch
+
+def main():
+    global path_data_web_scrapers, path_data_support_files, path_output_csv
+
+    print("The script is running...")
+    t_start = time()
+
+    #==============================================================================
+    # 1. LOAD DATA AND COMPILE THE CLASSIFIER
+    #==============================================================================
+    df_rock_news = pd.read_csv(f'{path_data_web_scrapers}/rock_news.csv',sep=';')
+    df_rock_news_subset = df_rock_news.iloc[0:20000,np.r_[-1,1]].copy()
+    classifier = RuleBasedClassifier.from_support_files(path_data_support_files)
+
+    #==============================================================================
+    # 2. TEXT CLASSIFICATION
+    #==============================================================================
+    dict_tag_lists = classifier.classify_tag_lists(df_rock_news_subset['title'].to_list())
+    df_category_tags = classifier.tags_frame(df_rock_news_subset['title'].to_list(), dict_tag_lists)
+    df_category_tags.index = df_rock_news_subset.index
+    df_rock_news_category_tags = df_rock_news_subset.drop('title', axis=1).join(df_category_tags.drop('title', axis=1))
+
+    #==============================================================================
+    # 3. SAVE DATA AS CSV FILE
+    #==============================================================================
+    df_rock_news_category_tags.to_csv(f'{path_output_csv}/rock_news_nlp_rock_news_category_tags.csv', header=True, index=False, encoding='utf-8',sep=';')
+    if sparse_output:
+        for i in classifier.list_tag_columns:
+            dict_tag_lists[i].save_npz(f'{path_output_sparse}/rock_news_nlp_rock_news_category_tags_{i}.npz', df_rock_news_category_tags['full_pk'])
+    print("...it has been successfully executed in %0.1fs." % (time() - t_start))
 
-df_rock_news = pd.read_csv(f'{path_data_web_scrapers}/rock_news.csv',sep=';')
-df_dict_category = pd.read_csv(f'{path_data_support_files}/support_text_class_news_category_dict.csv',sep=';')
-df_add_keywords = pd.read_csv(f'{path_data_support_files}/support_text_class_news_category_add_keywords.csv',sep=';')
-
-## 1.2. PREPARATORY TEXT PREPROCESSING 
-## CONVERT THE ROCK NEWS HEADLINES INTO A LIST
-df_rock_news_subset = df_rock_news.iloc[0:20000,np.r_[-1,1]].copy()
-corpus_title = df_rock_news_subset['title'].to_list()
-corpus_title = tpp.text_preprocessing_rule_based_txt_class_prep(corpus_title)
-
-## CREATE EXCEPTIONAL KEY WORD FLAGS ON THE TYPE OF PUBLICATION BEFORE REMOVING STOP WORDS & PUNCTUATION
-type_publication = {'story': [], 'musical list': [], 'recall event': [], 'opinion': [],
-                    'reaction': [], 'video/audio': [], 'poll/tourney': [], 'birthday reminder': []}
-set_is_story = set(['how ','musicians ','why ','who is ','who are ','when ','what ','this ',"here's ",'that time ','opinion |', 'odd couples: '])
-
-type_publication['story'].extend([1 if (i.startswith(tuple([j for j in set_is_story]))) else 0 for i in corpus_title])
-type_publication['musical list'].extend([1 if ((((i[:1].isdigit() and i[2]==" ") or (i[0].isdigit() and i[1]==" ")) 
-                                              and set([":","-"]).intersection(i.split())==False)
-                                              or "best rock + metal songs" in i or "rock + metal bands" in i) else 0 for i in corpus_title])
-type_publication['recall event'].extend([1 if "years ago:" in i or "years ago -" in i else 0 for i in corpus_title])
-type_publication['birthday reminder'].extend([1 if tpp.word_search('birthdays', i)==True 
-                                              and tpp.word_search('celebrating', i)==True else 0 for i in corpus_title])
-
-## 1.3. CORE TEXT PREPROCESSING TASKS
-corpus_title_clean = tpp.text_preprocessing_rule_based_txt_class(corpus_title)
-
-#==============================================================================
-# 2. TEXT CLASSIFICATION
-#==============================================================================
-
-## 2.1. TYPE OF PUBLICATION TAGS
-## 2.1.1. REMAINING KEY WORD FLAGS
-set_verbs_opinion = set(['reflect','think','say','explain','admit'])
-set_verbs_reaction = set(['react','respond'])
-
-type_publication['opinion'].extend([1 if [i for i in set_verbs_opinion if tpp.word_search(i,j)==True] else 0 for j in corpus_title_clean])
-type_publication['reaction'].extend([1 if [i for i in set_verbs_reaction if tpp.word_search(i,j)==True] else 0 for j in corpus_title_clean])
-type_publication['video/audio'].extend([1 if ([i for i in set(['watch','video']) if tpp.word_search(i,j)==True] or 
-                                              j.startswith(tuple([i for i in set(['see ','listen ','hear '])]))) else 0 for j in corpus_title_clean])
-type_publication['poll/tourney'].extend([1 if tpp.word_search('poll', i)==True or tpp.word_search('rrhof tourney', i)==True else 0 for i in corpus_title_clean])
-
-df_type_publication_prep = pd.DataFrame(type_publication)
-df_type_publication_prep['index_1'] = df_type_publication_prep.index
-df_type_publication_prep = pd.melt(df_type_publication_prep, id_vars=['index_1'], var_name = "type_publication", value_name = "count")                                                  
-df_type_publication_prep = df_type_publication_prep[(df_type_publication_prep['count']>0)]
-df_type_publication = df_type_publication_prep[['index_1','type_publication']].groupby('index_1').agg(pd.Series.tolist)
-
-## 2.2. NEWS ARTICLE TOPIC LABELS
-## 2.2.1 CREATE SUPPORT DICTIONARIES AND SETS
-df_dict_category['keyword_stem'] = df_dict_category['keyword'].apply(lambda i: ''.join(tpp.stem_word(tpp.token(i))))
-set_category_tags = set(df_dict_category['keyword_stem']) 
-dict_stem_keywords = df_dict_category.groupby('keyword_stem')['keyword'].agg('first').to_dict()
-dict_sub_category_tag_all = df_dict_category[df_dict_category['bool_type']=='all'].groupby('sub_category')['keyword_stem'].agg(set).to_dict()
-dict_sub_category_tag_any = df_dict_category[df_dict_category['bool_type']=='any'].groupby('sub_category')['keyword_stem'].agg(set).to_dict()
-dict_category_tag = df_dict_category.groupby('sub_category')['category'].agg('first').to_dict()
-
-## 2.2.2. RETURN KEYWORDS AND SUBCATEGORY TOPIC LABELS
-sub_category_tags = {'keywords': [], 'sub_category_tags': []}
-sub_category_tags['keywords'].extend([[i for i in set_category_tags if tpp.word_search(i,j)==True] for j in corpus_title_clean])
-sub_category_tag_all = [[k for k in dict_sub_category_tag_all.keys() if all(i in j for i in dict_sub_category_tag_all[k])] for j in sub_category_tags['keywords']]
-sub_category_tag_any = [[k for k in dict_sub_category_tag_any.keys() if any(i in j for i in dict_sub_category_tag_any[k])] for j in sub_category_tags['keywords']]
-sub_category_tags['sub_category_tags'].extend([list(i + j) for i, j in zip(sub_category_tag_all, sub_category_tag_any)])
-df_sub_category_tags = pd.DataFrame(sub_category_tags)
-
-## 2.2.3. RETURN CATEGORY TOPIC LABELS
-keywords_exploded = df_sub_category_tags['keywords'].to_frame().explode('keywords')
-keywords_exploded['index_1'] = keywords_exploded.index
-sub_category_tags_exploded = df_sub_category_tags['sub_category_tags'].to_frame().explode('sub_category_tags')
-sub_category_tags_exploded['index_1'] = sub_category_tags_exploded.index
-
-df_category_tags_prep = keywords_exploded.merge(sub_category_tags_exploded,how="outer",on='index_1')
-df_category_tags_prep['keywords'] = df_category_tags_prep['keywords'].map(dict_stem_keywords)
-df_category_tags_prep['category_tags'] = df_category_tags_prep['sub_category_tags'].map(dict_category_tag)
-df_category_tags_prep = df_category_tags_prep.dropna(subset=['keywords', 'sub_category_tags', 'category_tags'])
-df_category_tags_prep = df_category_tags_prep[~(df_category_tags_prep["keywords"].str.contains("new"))]
-df_category_tags_prep = df_category_tags_prep.groupby('index_1').agg(pd.Series.tolist)
-df_category_tags_prep = df_rock_news_subset.join([df_category_tags_prep,df_type_publication])
-
-utils_tpp.return_empty_list_from_nan(df_category_tags_prep,['keywords','sub_category_tags','category_tags','type_publication'])
-utils_tpp.remove_dups_sort_lists(df_category_tags_prep,['keywords','sub_category_tags','category_tags','type_publication'])
-
-df_category_tags_prep['sub_category_tags'] = df_category_tags_prep['sub_category_tags'].apply(lambda j: ['diverse topics'] if bool(j)==False else j)
-df_category_tags_prep['category_tags'] = df_category_tags_prep['category_tags'].apply(lambda j: ['diverse topics'] if bool(j)==False else j)
-df_category_tags_prep['type_publication'] = df_category_tags_prep['type_publication'].apply(lambda j: ['general'] if bool(j)==False else j)
-df_rock_news_category_tags = df_category_tags_prep.drop('title', axis=1)
-
-#==============================================================================
-# 3. SAVE DATA AS CSV FILE
-#==============================================================================
-
-df_rock_news_category_tags.to_csv(f'{path_output_csv}/rock_news_nlp_rock_news_category_tags.csv', header=True, index=False, encoding='utf-8',sep=';')
-print("...it has been successfully executed in %0.1fs." % (time() - t_start))
+if __name__ == "__main__":
+    main()
@@ -89,7 +89,8 @@ def save_py_object(py_object, path, py_object_file_name):
      	Write the pickled representation of the object obj to the open file 
         object file
     """  
-    return pickle.dump(py_object, open(f'{path}/{py_object_file_name}', "wb"))
+    with open(f'{path}/{py_object_file_name}', "wb") as f:
+        pickle.dump(py_object, f)
 
 def load_py_object(py_object, path, py_object_file_name):
     """